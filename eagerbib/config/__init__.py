@@ -1,13 +1,20 @@
 import argparse
 import dataclasses
+import functools
+import json
 import os
+import sys
 import typing
-from typing import Optional, Type, TypeVar
+from typing import Any, Optional, Sequence, Type, TypeVar
+
+import dataclass_wizard
+import yaml
 
 from . import utils as ut
 from .config import (BaseConfig, DBLPCrawlerConfig, MainConfig,  # noqa: F401
                      NameNormalizationConfig, OnlineUpdaterConfig,
                      OutputProcessorConfig)
+from .config import _YAMLLoader
 
 __basefolder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -15,11 +22,44 @@ __basefolder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 C = TypeVar("C", bound=BaseConfig)
 
 
-def __get_arg_parser(cfg_cls: Type[C]) -> argparse.ArgumentParser:
+def __get_referenced_nested_fields(
+    cfg_cls: Type[C], argv: Sequence[str]
+) -> Optional[set[str]]:
+    """Get the nested configs of a config class that are referenced in the arguments.
+
+    Args:
+        cfg_cls: The config class to use.
+        argv: The command line arguments.
+
+    Returns:
+        Optional[set[str]]: The names of the referenced nested config fields or None
+            if all of them need to be considered (e.g., to show the help).
+    """
+    if "-h" in argv or "--help" in argv:
+        return None
+
+    options = [arg.split("=")[0] for arg in argv if arg.startswith("--")]
+    referenced_fields = set()
+    for field in ut.get_nested_cli_parameter_fields(cfg_cls):
+        prefix = "--" + field.name.replace("_", "-") + "."
+        # Also consider abbreviated options, as supported by argparse.
+        if any(o.startswith(prefix) or prefix.startswith(o) for o in options):
+            referenced_fields.add(field.name)
+    return referenced_fields
+
+
+def __get_arg_parser(
+    cfg_cls: Type[C], argv: Optional[Sequence[str]] = None
+) -> argparse.ArgumentParser:
     """Create a parser for the command line arguments.
 
+    Arguments of nested configs are only added if they are referenced in argv, as
+    adding all of them slows down the startup.
+
     Args:
         cfg_cls: The config class to use.
+        argv: The command line arguments that will be parsed. If None, all arguments
+            are added to the parser.
 
     Returns:
         argparse.ArgumentParser: The parser.
@@ -29,8 +69,37 @@ def __get_arg_parser(cfg_cls: Type[C]) -> argparse.ArgumentParser:
         "--config", "-c", type=str, default=None, help="The config yaml file to use."
     )
 
-    # Add all the parameters to the parser.
-    cli_parameters = ut.get_all_cli_parameters(cfg_cls)
+    # Add all the (referenced) parameters to the parser.
+    nested_fields = (
+        __get_referenced_nested_fields(cfg_cls, argv) if argv is not None else None
+    )
+    for args, kwargs in __get_argument_specs(
+        cfg_cls, frozenset(nested_fields) if nested_fields is not None else None
+    ):
+        parser.add_argument(*args, **kwargs)
+
+    return parser
+
+
+@functools.lru_cache(maxsize=None)
+def __get_argument_specs(
+    cfg_cls: Type[C], nested_fields: Optional[frozenset[str]]
+) -> tuple[tuple[tuple[str, ...], dict[str, Any]], ...]:
+    """Get the arguments for `parser.add_argument` for all CLI parameters.
+
+    This is cached, as the CLI parameters of a config class never change.
+
+    Args:
+        cfg_cls: The config class to use.
+        nested_fields: The names of the nested configs to consider or None to
+            consider all of them.
+
+    Returns:
+        tuple[tuple[tuple[str, ...], dict[str, Any]], ...]: The positional and
+            keyword arguments for each call of `parser.add_argument`.
+    """
+    argument_specs = []
+    cli_parameters = ut.get_all_cli_parameters(cfg_cls, nested_fields=nested_fields)
     for clip in cli_parameters:
         args = ["--" + clip["name"].replace("_", "-")]
         if clip["short_name"] is not None:
@@ -58,15 +127,19 @@ def __get_arg_parser(cfg_cls: Type[C]) -> argparse.ArgumentParser:
 
         if clip["type"] == bool:
             conditional_kwargs["action"] = __BooleanOptionalAction
-        parser.add_argument(
-            *args,
-            default=default,
-            help=clip["help"],
-            required=clip["required"],
-            **conditional_kwargs
+        argument_specs.append(
+            (
+                tuple(args),
+                dict(
+                    default=default,
+                    help=clip["help"],
+                    required=clip["required"],
+                    **conditional_kwargs
+                ),
+            )
         )
 
-    return parser
+    return tuple(argument_specs)
 
 
 class __BooleanOptionalAction(argparse.Action):
@@ -128,6 +201,45 @@ class __BooleanOptionalAction(argparse.Action):
         return " | ".join(self.option_strings)
 
 
+def __load_cached_config_file(cfg_cls: Type[C], config_fn: str) -> C:
+    """Load a config file using a JSON cache stored next to it.
+
+    The cache contains the parsed content of the YAML file and is only used if it is
+    newer than the YAML file. Parsing JSON is considerably faster than parsing YAML.
+
+    Args:
+        cfg_cls: The config class to use.
+        config_fn: The YAML config file to load.
+
+    Returns:
+        C: The config.
+    """
+    cache_fn = config_fn + ".cache.json"
+    if os.path.exists(cache_fn) and os.path.getmtime(cache_fn) >= os.path.getmtime(
+        config_fn
+    ):
+        with open(cache_fn, "r") as cache_f:
+            try:
+                data = json.load(cache_f)
+            except json.decoder.JSONDecodeError:
+                pass
+            else:
+                return dataclass_wizard.fromdict(cfg_cls, data)
+
+    with open(config_fn, "r") as f:
+        data = yaml.load(f, Loader=_YAMLLoader)
+
+    # The config file might be stored in a read-only location (e.g., a system-wide
+    # installation), in which case we just do not cache it.
+    try:
+        with open(cache_fn, "w") as cache_f:
+            json.dump(data, cache_f)
+    except OSError:
+        pass
+
+    return dataclass_wizard.fromdict(cfg_cls, data)
+
+
 def get_config(cfg_cls: Type[C], default_config_fn: Optional[str] = None) -> C:
     """Get the config based on the indicated config file and other arguments.
 
@@ -139,13 +251,14 @@ def get_config(cfg_cls: Type[C], default_config_fn: Optional[str] = None) -> C:
     Returns:
         MainConfig: The config.
     """
-    parser = __get_arg_parser(cfg_cls)
-    args = parser.parse_args()
+    argv = sys.argv[1:]
+    parser = __get_arg_parser(cfg_cls, argv)
+    args = parser.parse_args(argv)
     if args.config is not None:
         config = cfg_cls.from_yaml_file(args.config)
     else:
         if default_config_fn is not None and os.path.exists(default_config_fn):
-            config = cfg_cls.from_yaml_file(default_config_fn)
+            config = __load_cached_config_file(cfg_cls, default_config_fn)
         else:
             config = cfg_cls()
     del args.config
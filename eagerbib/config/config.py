@@ -2,6 +2,7 @@ import dataclasses
 import os
 
 import dataclass_wizard
+import yaml
 
 from .. import utils as but
 from . import utils as ut
@@ -9,6 +10,11 @@ from . import utils as ut
 # The root directory of the app.
 _basefolder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# Use the libyaml-based loader/dumper if available, as they are much faster than
+# the pure-Python implementations.
+_YAMLLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAMLDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 @dataclasses.dataclass
 class OnlineUpdaterConfig:
@@ -32,6 +38,12 @@ class OnlineUpdaterConfig:
         "to less buffering while updating references but this requires "
         "sufficiently high network bandwidth.",
     )
+    cache_ttl_days: float = ut.cli_parameter(
+        "t",
+        default=30.0,
+        help="Number of days for which the suggestions of the online services are "
+        "cached. Set to 0 to disable the cache.",
+    )
 
 
 @dataclasses.dataclass
@@ -77,7 +89,18 @@ class OutputProcessorConfig:
 
 @dataclasses.dataclass
 class BaseConfig(dataclass_wizard.YAMLWizard):
-    pass
+    @classmethod
+    def from_yaml(cls, string_or_stream, *, decoder=None, **decoder_kwargs):
+        if decoder is None:
+            decoder = yaml.load
+            decoder_kwargs.setdefault("Loader", _YAMLLoader)
+        return super().from_yaml(string_or_stream, decoder=decoder, **decoder_kwargs)
+
+    def to_yaml(self, *, encoder=None, **encoder_kwargs):
+        if encoder is None:
+            encoder = yaml.dump
+            encoder_kwargs.setdefault("Dumper", _YAMLDumper)
+        return super().to_yaml(encoder=encoder, **encoder_kwargs)
 
 
 @dataclasses.dataclass
@@ -94,6 +117,12 @@ class DBLPCrawlerConfig(BaseConfig):
         help="True to create a tar.gz file from the output "
         "directory. For easier distribution.",
     )
+    refresh_existing: bool = ut.cli_parameter(
+        "r",
+        default=False,
+        help="True to download already existing BibTeX files again if they have "
+        "been modified on dblp.org since they were downloaded.",
+    )
 
 
 @dataclasses.dataclass
@@ -107,6 +136,14 @@ class MainConfig(BaseConfig):
         default=but.get_default_data_directory(),
         help="Folder to load offline candidate bibliography files from.",
     )
+    fuzzy_match_threshold: float = ut.cli_parameter(
+        "f",
+        default=0.0,
+        help="Minimum similarity (0-100) of the titles of an input entry and an "
+        "offline candidate to suggest the candidate in the manual updater if no "
+        "candidate with the exact same title exists. Set to 0 to disable. Requires "
+        "rapidfuzz to be installed.",
+    )
     online_updater: OnlineUpdaterConfig = ut.cli_parameter(
         "ol",
         default_factory=OnlineUpdaterConfig,
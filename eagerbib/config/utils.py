@@ -1,5 +1,7 @@
 import dataclasses
-from typing import Any, Callable, Optional
+import functools
+import itertools
+from typing import Any, Callable, Container, Optional
 
 
 def cli_parameter(
@@ -28,20 +30,62 @@ def cli_parameter(
     )
 
 
-def get_all_cli_parameters(cls, name_prefix="", short_prefix=""):
-    """Get all the CLI parameters of a class."""
+def get_nested_cli_parameter_fields(cls) -> list[dataclasses.Field]:
+    """Get the CLI parameter fields of a class that are nested configs themselves."""
+    return [
+        field
+        for field in dataclasses.fields(cls)
+        if field.metadata.get("is_cli_parameter", False)
+        and dataclasses.is_dataclass(cls.__annotations__[field.name])
+    ]
+
+
+def get_all_cli_parameters(
+    cls,
+    name_prefix="",
+    short_prefix="",
+    nested_fields: Optional[Container[str]] = None,
+):
+    """Get all the CLI parameters of a class.
+
+    Args:
+        cls: The config class.
+        name_prefix: The prefix to prepend to the names of the parameters.
+        short_prefix: The prefix to prepend to the short names of the parameters.
+        nested_fields: If not None, only recurse into the nested configs whose field
+            names are contained in it. Nested configs deeper down are always
+            fully recursed into.
+    """
+    if nested_fields is not None:
+        nested_fields = frozenset(nested_fields)
+    return [
+        dict(clip)
+        for clip in _collect_cli_parameters(
+            cls, name_prefix, short_prefix, nested_fields
+        )
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _collect_cli_parameters(
+    cls, name_prefix: str, short_prefix: str, nested_fields: Optional[frozenset[str]]
+) -> tuple[dict[str, Any], ...]:
+    """Collect the CLI parameters of a class; memoized as the classes are static."""
     cli_parameters = []
     fields = dataclasses.fields(cls)
     for field in fields:
         if field.metadata.get("is_cli_parameter", False):
             field_type = cls.__annotations__[field.name]
             if dataclasses.is_dataclass(field_type):
-                cli_parameters += get_all_cli_parameters(
+                if nested_fields is not None and field.name not in nested_fields:
+                    continue
+                cli_parameters += _collect_cli_parameters(
                     field_type,
                     f"{name_prefix}{field.name}." if name_prefix else f"{field.name}.",
                     f"{short_prefix}{field.metadata['short_name']}."
                     if short_prefix
                     else f"{field.metadata['short_name']}.",
+                    None,
                 )
             else:
                 cli_parameters.append(
@@ -55,7 +99,24 @@ def get_all_cli_parameters(cls, name_prefix="", short_prefix=""):
                         help=field.metadata["help"],
                     )
                 )
-    return cli_parameters
+    return tuple(cli_parameters)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_cli_parameter_defaults(cls) -> dict[str, Any]:
+    """Get the default values of the CLI parameters of a class.
+
+    This is cached to avoid calling the default factories repeatedly. The returned
+    values must therefore not be modified.
+    """
+    defaults = {}
+    for field in dataclasses.fields(cls):
+        if field.metadata.get("is_cli_parameter", False):
+            if field.metadata["default_factory"] is not dataclasses.MISSING:
+                defaults[field.name] = field.metadata["default_factory"]()
+            else:
+                defaults[field.name] = field.metadata["default"]
+    return defaults
 
 
 def update_object_with_dict(obj, d):
@@ -68,37 +129,25 @@ def update_object_with_dict(obj, d):
     if not dataclasses.is_dataclass(type(obj)):
         return
 
+    fields_by_name = {f.name: f for f in dataclasses.fields(type(obj))}
+    defaults = _get_cli_parameter_defaults(type(obj))
+
     # Update the top-level fields.
     keys = [k for k in d.keys() if "." not in k]
     for k in keys:
-        potential_fields = [f for f in dataclasses.fields(type(obj)) if f.name == k]
-        if len(potential_fields) == 0:
+        field = fields_by_name.get(k)
+        if field is None:
             raise ValueError(f"Unknown argument {k} for {type(obj).__name__}")
-        field = potential_fields[0]
         # Only update the field if it is a CLI parameter and the value is not
         # the default one.
         if field.metadata.get("is_cli_parameter", False):
-            if field.metadata["default_factory"] is not dataclasses.MISSING:
-                default = field.metadata["default_factory"]()
-            else:
-                default = field.metadata["default"]
-
-            if d[k] != default:
+            if d[k] != defaults[k]:
                 setattr(obj, k, d[k])
 
-    # Update the nested fields.
-    inner_keys = sorted([k for k in d.keys() if "." in k])
-    previous_inner_key = None
-    previous_inner_index = 0
-    for i, k in enumerate(inner_keys):
-        inner_key = k.split(".")[0]
-        if previous_inner_key is None:
-            previous_inner_key = inner_key
-        if inner_key != previous_inner_key or i == len(inner_keys) - 1:
-            inner_dict = {
-                ".".join(ki.split(".")[1:]): d[ki]
-                for ki in inner_keys[previous_inner_index:i]
-            }
-            update_object_with_dict(getattr(obj, previous_inner_key), inner_dict)
-            previous_inner_key = inner_key
-            previous_inner_index = i
\ No newline at end of file
+    # Update the nested fields, grouped by their top-level field.
+    inner_keys = sorted(k for k in d.keys() if "." in k)
+    for inner_key, group in itertools.groupby(
+        inner_keys, key=lambda k: k.split(".", 1)[0]
+    ):
+        inner_dict = {k.split(".", 1)[1]: d[k] for k in group}
+        update_object_with_dict(getattr(obj, inner_key), inner_dict)
@@ -3,28 +3,78 @@
 This will save overall bandwidth and time, as the data is cached locally and less
 queries need to be send to dblp.org in the long run.
 """
+import asyncio
+import codecs
 import contextlib
-import inspect
+import email.utils
+import io
 import os
 import re
-import time
+import sys
 import warnings
-from typing import Optional
+from typing import (Any, Awaitable, Callable, Iterable, Optional, TextIO,
+                    TypeVar)
 
-import requests
+import aiohttp
 import tqdm
+from tqdm.asyncio import tqdm_asyncio
 import os
 import eagerbib.config as cfg
+import eagerbib.lookup_service as lus
+import eagerbib.utils as ut
 from eagerbib.main import load_reference_bibliography
 import tarfile
 import glob
 
+T = TypeVar("T")
+R = TypeVar("R")
 
-def get_all_occurrences_of_venue(venue_key: str) -> list[Optional[str]]:
+# Matches the link to the table of contents of a venue occurrence on dblp.org.
+_BHT_PATTERN = re.compile(
+    r'<a class="toc-link" href="(https?://[^\s"]+)">\[contents\]<\/a>'
+)
+# Number of characters to keep from the previous chunk when searching a stream for
+# the pattern above, so that matches spanning two chunks are found.
+_BHT_PATTERN_OVERLAP = 512
+
+
+async def _gather_bounded(
+    items: Iterable[T],
+    fn: Callable[[T], Awaitable[R]],
+    limit: int = 8,
+    **tqdm_kwargs: Any,
+) -> list[R]:
+    """Apply an async function to all items concurrently while showing the progress.
+
+    Args:
+        items (Iterable[T]): The items.
+        fn (Callable[[T], Awaitable[R]]): The async function to apply.
+        limit (int, optional): The maximum number of concurrent calls of `fn`.
+            Defaults to 8.
+        **tqdm_kwargs: Additional arguments for the progress bar.
+
+    Returns:
+        list[R]: The results in the order of the items.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await fn(item)
+
+    return await tqdm_asyncio.gather(*[run(it) for it in items], **tqdm_kwargs)
+
+
+async def get_all_occurrences_of_venue(
+    session: aiohttp.ClientSession, venue_key: str, n_parallel_requests: int = 8
+) -> list[Optional[str]]:
     """Get all occurrences of a venue from dblp.org.
 
     Args:
+        session (aiohttp.ClientSession): The HTTP session to use.
         venue_key (str): The dblp.org key of the venue.
+        n_parallel_requests (int, optional): The maximum number of concurrent
+            requests to obtain the BHT identifiers of the occurrences. Defaults to 8.
 
     Returns:
         list[str]: A list of dblp.org keys of all occurrences of the venue.
@@ -34,83 +84,89 @@ def get_all_occurrences_of_venue(venue_key: str) -> list[Optional[str]]:
         "stream%3Astreams/{0}%3A&h=1000&format=json"
     ).format(venue_key)
 
-    def _get_bht(dblp_url: str) -> Optional[str]:
-        """Get the BHT identifier from a dblp.org URL without sending too many requests.
-        See `get_bht_identifier_from_dblp_url` for more information.
-
-        Args:
-            dblp_url (str): The dblp.org URL.
-
-        Returns:
-            Optional[str]: The BHT identifier or None if it could not be obtained.
-        """
-        # Sleep to avoid overloading the server.
-        time.sleep(3)
-        return get_bht_identifier_from_dblp_url(dblp_url)
-
     while True:
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-            if data["result"]["status"]["@code"] == "200":
-                hits_info = data["result"]["hits"]
-                if hits_info["@sent"] != hits_info["@total"]:
-                    raise NotImplementedError("Pagination not implemented yet.")
-                urls = [hit["info"]["url"] for hit in hits_info["hit"]]
-                bhts = [
-                    _get_bht(url)
-                    for url in tqdm.tqdm(
+        async with session.get(url) as response:
+            if response.status == 200:
+                data = await response.json(content_type=None)
+                if data["result"]["status"]["@code"] == "200":
+                    hits_info = data["result"]["hits"]
+                    if hits_info["@sent"] != hits_info["@total"]:
+                        raise NotImplementedError("Pagination not implemented yet.")
+                    urls = [hit["info"]["url"] for hit in hits_info["hit"]]
+                    bhts = await _gather_bounded(
                         urls,
+                        lambda url: get_bht_identifier_from_dblp_url(session, url),
+                        limit=n_parallel_requests,
                         desc=f"Obtaining BHT identifiers for {venue_key}",
                         position=1,
                         leave=False,
                     )
-                ]
 
-                return bhts
-            else:
-                print("Error: ", data["result"]["status"]["@code"])
-        elif response.status_code == 429:
-            if response.headers.get("Retry-After"):
-                time.sleep(int(response.headers["Retry-After"]))
-                warnings.warn(
-                    f"Rate limited. Retrying after {response.headers['Retry-After']} "
-                    "seconds.")
-        time.sleep(5)
+                    return bhts
+                else:
+                    print("Error: ", data["result"]["status"]["@code"])
+            elif response.status == 429:
+                if response.headers.get("Retry-After"):
+                    await asyncio.sleep(int(response.headers["Retry-After"]))
+                    warnings.warn(
+                        "Rate limited. Retrying after "
+                        f"{response.headers['Retry-After']} seconds.")
+        await asyncio.sleep(5)
+
+
+class _TqdmIO(io.TextIOBase):
+    """A text stream writing complete lines via tqdm.write to not break progress bars.
+
+    Args:
+        stream (TextIO): The stream tqdm.write writes to.
+    """
+
+    def __init__(self, stream: TextIO):
+        super().__init__()
+        self._stream = stream
+        self._buffer = ""
+
+    def write(self, s: str) -> int:
+        *lines, self._buffer = (self._buffer + s).split("\n")
+        for line in lines:
+            tqdm.tqdm.write(line, file=self._stream)
+        return len(s)
+
+    def flush(self) -> None:
+        if self._buffer:
+            tqdm.tqdm.write(self._buffer, file=self._stream)
+            self._buffer = ""
 
 
 @contextlib.contextmanager
 def redirect_to_tqdm():
     """Redirect print to tqdm.write allowing comfortable printing while using tqdm."""
-    # Store builtin print
-    old_print = print
-
-    def new_print(*args, **kwargs):
-        # If tqdm.tqdm.write raises error, use builtin print
-        try:
-            value = " ".join(args)
-            tqdm.tqdm.write(value, **kwargs)
-        except:
-            old_print(*args, **kwargs)
-
+    stream = _TqdmIO(sys.stdout)
     try:
-        # Globally replace print with new_print
-        inspect.builtins.print = new_print
-        yield
+        with contextlib.redirect_stdout(stream):
+            yield
     finally:
-        inspect.builtins.print = old_print
+        stream.flush()
 
 
-def download_bibtex_of_venue_occurrence(
-    bht_identifier: str, base_folder: str, n_max_attempts: int = 10
+async def download_bibtex_of_venue_occurrence(
+    session: aiohttp.ClientSession,
+    bht_identifier: str,
+    base_folder: str,
+    n_max_attempts: int = 10,
+    refresh_existing: bool = False,
 ) -> None:
     """Download the bibtex data of a venue occurrence from dblp.org.
 
     Args:
+        session (aiohttp.ClientSession): The HTTP session to use.
         bht_identifier (str): The BHT name on dblp.org of the venue occurrence.
         base_folder (str): The base folder where the bibtex data will be stored.
         n_max_attempts (int, optional): The maximum number of attempts to download
             the bibtex data. Defaults to 10.
+        refresh_existing (bool, optional): True to download the bibtex data again
+            if it has already been downloaded before but was modified on dblp.org
+            since then. Otherwise, existing data is skipped. Defaults to False.
     """
     venue_occurrence_key = bht_identifier
     if venue_occurrence_key.startswith("db/"):
@@ -124,89 +180,116 @@ def download_bibtex_of_venue_occurrence(
     ).format(bht_identifier.replace("/", "%2F"))
 
     fn = os.path.join(base_folder, f"{venue_occurrence_key.replace('/', '_')}.bib")
-    # Skip if file already exists.
+    # Skip if file already exists, or only download it if it has been modified.
+    headers = {}
     if os.path.exists(fn):
-        return
+        if not refresh_existing:
+            return
+        headers["If-Modified-Since"] = email.utils.formatdate(
+            os.path.getmtime(fn), usegmt=True
+        )
 
-    def fetch(url: str, n_max_attempts: int) -> Optional[str]:
+    async def fetch(
+        url: str, n_max_attempts: int, headers: Optional[dict[str, str]] = None
+    ) -> tuple[Optional[int], Optional[str]]:
+        status = None
         for _ in range(n_max_attempts):
             try:
-                response = requests.get(url)
-                if response.status_code == 200:
-                    return response.text
-                elif response.status_code == 429:
-                    if response.headers.get("Retry-After"):
-                        time.sleep(int(response.headers["Retry-After"]))
-                        warnings.warn(
-                            "Rate limited. Retrying after "
-                            f"{response.headers['Retry-After']} seconds.")
-                else:
-                    time.sleep(2)
-            except requests.exceptions.RequestException:
-                time.sleep(5)
-        return None
+                async with session.get(url, headers=headers) as response:
+                    status = response.status
+                    if response.status == 200:
+                        return status, await response.text()
+                    elif response.status == 304:
+                        return status, None
+                    elif response.status == 429:
+                        if response.headers.get("Retry-After"):
+                            await asyncio.sleep(int(response.headers["Retry-After"]))
+                            warnings.warn(
+                                "Rate limited. Retrying after "
+                                f"{response.headers['Retry-After']} seconds.")
+                    else:
+                        await asyncio.sleep(2)
+            except aiohttp.ClientError:
+                await asyncio.sleep(5)
+        return status, None
 
     # The dblp API can only return 1000 entries at a time. We need to paginate.
-    data = ""
+    # Write the pages to a temporary file directly and only move it to its final
+    # location once all pages have been downloaded.
+    part_fn = fn + ".part"
+    written_any = False
     start_idx = 0
     pagination_reached_end = False
-    while not pagination_reached_end:
-        url = base_url.format(start_idx, start_idx + 1000)
-        start_idx += 1000
+    with open(part_fn, "w") as f:
+        while not pagination_reached_end:
+            url = base_url.format(start_idx, start_idx + 1000)
+            # Only the first page decides whether the data has been modified.
+            page_headers = headers if start_idx == 0 else None
+            start_idx += 1000
+
+            status, response = await fetch(url, n_max_attempts, page_headers)
+            await asyncio.sleep(5)
+            if status == 304:
+                break
+            if response is None:
+                break
+            else:
+                f.write(response)
+                written_any = written_any or len(response) > 0
+            if len(response) == 0:
+                pagination_reached_end = True
 
-        response = fetch(url, n_max_attempts)
-        time.sleep(5)
-        if response is None:
-            warnings.warn(
-                f"Max attempts reached for `{venue_occurrence_key}`. Skipping. "
-            )
-            return
-        else:
-            data += response
-        if len(response) == 0:
-            pagination_reached_end = True
+    if status == 304:
+        os.unlink(part_fn)
+        return
+
+    if not pagination_reached_end:
+        os.unlink(part_fn)
+        warnings.warn(
+            f"Max attempts reached for `{venue_occurrence_key}`. Skipping. "
+        )
+        return
 
-    if len(data) == 0:
+    if not written_any:
+        os.unlink(part_fn)
         warnings.warn(f"No data for `{venue_occurrence_key}`. Skipping.")
         return
 
-    with open(fn, "w") as f:
-        f.write(data)
+    os.replace(part_fn, fn)
 
 
-def get_bht_identifier_from_dblp_url(
-    dblp_url: str, n_max_attempts: int = 3
+async def get_bht_identifier_from_dblp_url(
+    session: aiohttp.ClientSession, dblp_url: str, n_max_attempts: int = 3
 ) -> Optional[str]:
     """Get the BHT identifier from a dblp.org URL.
 
     Args:
+        session (aiohttp.ClientSession): The HTTP session to use.
         dblp_url (str): The dblp.org URL.
 
     Returns:
         Optional[str]: The BHT identifier if it can be found.
     """
-    text = ""
     for _ in range(n_max_attempts):
-        pattern = re.compile(
-            r'<a class="toc-link" href="(https?://[^\s"]+)">\[contents\]<\/a>'
-        )
-        with requests.get(dblp_url, stream=True) as r:
-            if r.status_code == 429:
+        async with session.get(dblp_url) as r:
+            if r.status == 429:
                 if r.headers.get("Retry-After"):
-                    time.sleep(int(r.headers["Retry-After"]))
+                    await asyncio.sleep(int(r.headers["Retry-After"]))
                     warnings.warn(
                         f"Rate limited. Retrying after {r.headers['Retry-After']} "
                         "seconds.")
-            elif r.status_code != 200:
-                time.sleep(5)
+            elif r.status != 200:
+                await asyncio.sleep(5)
                 continue
-            iterator = r.iter_content(chunk_size=1024)
-            for bytes in iterator:
-                new_text = bytes.decode("utf-8")
-                text += new_text
-                matches = pattern.findall(text)
-                if len(matches) > 0:
-                    value = matches[0]
+            # Only search the newly received text (plus some overlap) instead of
+            # everything received so far.
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            text = ""
+            async for chunk in r.content.iter_chunked(1024):
+                text = text[-_BHT_PATTERN_OVERLAP:] + decoder.decode(chunk)
+                match = _BHT_PATTERN.search(text)
+                if match is not None:
+                    value = match.group(1)
                     if value.startswith("https://dblp.org/"):
                         value = value[17:]
                     if value.endswith(".html"):
@@ -216,6 +299,56 @@ def get_bht_identifier_from_dblp_url(
     return None
 
 
+async def crawl_venues(
+    venues: list[str],
+    output: str,
+    n_parallel_downloads: int = 8,
+    refresh_existing: bool = False,
+) -> None:
+    """Download the bibtex data of all occurrences of the venues from dblp.org.
+
+    Args:
+        venues (list[str]): The dblp.org keys of the venues.
+        output (str): The folder where the bibtex data will be stored.
+        n_parallel_downloads (int, optional): The maximum number of venue
+            occurrences to resolve/download concurrently. Defaults to 8.
+        refresh_existing (bool, optional): True to download already existing
+            bibtex data again if it was modified on dblp.org. Defaults to False.
+    """
+    semaphore = asyncio.Semaphore(n_parallel_downloads)
+
+    async with lus.create_aiohttp_session(
+        limit_per_host=n_parallel_downloads
+    ) as session:
+
+        async def download(oc: str) -> None:
+            async with semaphore:
+                await download_bibtex_of_venue_occurrence(
+                    session, oc, output, refresh_existing=refresh_existing
+                )
+
+        for venue in tqdm.tqdm(venues, desc="Processing venues", position=0):
+            # Sleep to avoid overloading the server.
+            await asyncio.sleep(30)
+            occurrences = await get_all_occurrences_of_venue(
+                session, venue, n_parallel_downloads
+            )
+            # Filter out None values for which no BHT key could be extracted.
+            # This should rarely/never happen.
+            occurrences = [oc for oc in occurrences if oc is not None]
+            with redirect_to_tqdm():
+                for task in tqdm_asyncio.as_completed(
+                    [download(oc) for oc in occurrences],
+                    desc=f"Downloading BibTex data for {venue}",
+                    position=1,
+                    leave=False,
+                ):
+                    try:
+                        await task
+                    except Exception as e:
+                        warnings.warn(f"Failed to download data for {venue}: {e}")
+
+
 def main():
     config = cfg.get_config(cfg.DBLPCrawlerConfig)
 
@@ -233,25 +366,13 @@ def main():
                 "Existing files might be overwritten."
             )
 
-    for venue in tqdm.tqdm(config.venues, desc="Processing venues", position=0):
-        # Sleep to avoid overloading the server.
-        time.sleep(30)
-        occurrences = get_all_occurrences_of_venue(venue)
-        # Filter out None values for which no BHT key could be extracted.
-        # This should rarely/never happen.
-        occurrences = [oc for oc in occurrences if oc is not None]
-        for oc in tqdm.tqdm(
-            occurrences,
-            desc=f"Downloading BibTex data for {venue}",
-            position=1,
-            leave=False,
-        ):
-            with redirect_to_tqdm():
-                # Sleep to avoid overloading the server.
-                time.sleep(10)
-                download_bibtex_of_venue_occurrence(oc, config.output)
+    asyncio.run(
+        crawl_venues(
+            config.venues, config.output, refresh_existing=config.refresh_existing
+        )
+    )
 
-    print("Creating cache.json.gz file.")
+    print("Creating cache file.")
     load_reference_bibliography(config.output)
 
     if config.create_targz:
@@ -259,9 +380,12 @@ def main():
         with tarfile.open(config.output + ".tar.gz", "w:gz") as tar:
             for fn in glob.glob(os.path.join(config.output, "*.bib")):
                 tar.add(fn, arcname=os.path.basename(fn))
-            tar.add(
-                os.path.join(config.output, "cache.json.gz"), arcname="cache.json.gz"
-            )
+            for cache_fn in (
+                ut.BIBLIOGRAPHY_CACHE_FN,
+                ut.LEGACY_BIBLIOGRAPHY_CACHE_FN,
+            ):
+                if os.path.exists(os.path.join(config.output, cache_fn)):
+                    tar.add(os.path.join(config.output, cache_fn), arcname=cache_fn)
 
 
 if __name__ == "__main__":
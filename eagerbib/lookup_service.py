@@ -1,13 +1,16 @@
 import asyncio
+import functools
+import json
+import sqlite3
+import time
 from abc import ABC
 from abc import abstractmethod
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 from typing import List
 from typing import Union
 
 import aiohttp
-import urllib
-import bibtexparser
+import urllib.parse
 import warnings
 import ssl
 import certifi
@@ -18,7 +21,128 @@ import eagerbib.utils as ut
 DictTree = Dict[str, Union[str, Dict[str, str]]]
 
 
+@functools.lru_cache(maxsize=None)
+def _get_ssl_context() -> ssl.SSLContext:
+    """Get the SSL context used for all requests.
+
+    Creating it requires loading the entire CA bundle, so this is done only once
+    and only when it is needed for the first time.
+    """
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+@functools.lru_cache(maxsize=4096)
+def _encoded_title(title: str) -> str:
+    """Normalize a title and encode it for use in a query string.
+
+    This is cached since the same title is looked up by all services.
+    """
+    return urllib.parse.quote_plus(ut.cleanup_title(title))
+
+
+def create_aiohttp_session(**connector_kwargs: Any) -> aiohttp.ClientSession:
+    """Create an HTTP session that verifies certificates using certifi's CA bundle.
+
+    Args:
+        **connector_kwargs: Additional arguments for the aiohttp.TCPConnector.
+
+    Returns:
+        aiohttp.ClientSession: The session.
+    """
+    connector = aiohttp.TCPConnector(ssl=_get_ssl_context(), **connector_kwargs)
+    return aiohttp.ClientSession(connector=connector)
+
+
+class SuggestionCache:
+    """A persistent cache of the suggestions returned by the lookup services.
+
+    Args:
+        fn (str): The path to the SQLite database to store the cache in.
+        ttl (float): The time in seconds after which cached suggestions expire.
+    """
+
+    def __init__(self, fn: str, ttl: float) -> None:
+        self.ttl = ttl
+        self._connection = sqlite3.connect(fn)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS suggestions (service TEXT, title TEXT, "
+            "n INTEGER, created REAL, suggestions TEXT, "
+            "PRIMARY KEY (service, title, n))"
+        )
+        self._connection.commit()
+
+    def get(
+        self, service: str, title: str, max_suggestions: int
+    ) -> Optional[List[Dict[str, str]]]:
+        """Get the cached suggestions of a service for a title.
+
+        Args:
+            service (str): The name of the lookup service.
+            title (str): The normalized title.
+            max_suggestions (int): The maximum number of suggestions requested.
+
+        Returns:
+            Optional[List[Dict[str, str]]]: The suggestions or None if they are not
+                cached or expired.
+        """
+        row = self._connection.execute(
+            "SELECT created, suggestions FROM suggestions "
+            "WHERE service = ? AND title = ? AND n = ?",
+            (service, title, max_suggestions),
+        ).fetchone()
+        if row is None or time.time() - row[0] > self.ttl:
+            return None
+        return json.loads(row[1])
+
+    def set(
+        self,
+        service: str,
+        title: str,
+        max_suggestions: int,
+        suggestions: List[Dict[str, str]],
+    ) -> None:
+        """Store the suggestions of a service for a title.
+
+        Args:
+            service (str): The name of the lookup service.
+            title (str): The normalized title.
+            max_suggestions (int): The maximum number of suggestions requested.
+            suggestions (List[Dict[str, str]]): The suggestions.
+        """
+        self._connection.execute(
+            "INSERT OR REPLACE INTO suggestions VALUES (?, ?, ?, ?, ?)",
+            (service, title, max_suggestions, time.time(), json.dumps(suggestions)),
+        )
+        self._connection.commit()
+
+    def close(self) -> None:
+        """Remove expired suggestions and close the database."""
+        self._connection.execute(
+            "DELETE FROM suggestions WHERE created < ?", (time.time() - self.ttl,)
+        )
+        self._connection.commit()
+        self._connection.close()
+
+
 class LookupService(ABC):
+    NAME: str
+
+    def __init__(self) -> None:
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the HTTP session of this service, which is shared across all requests
+        to make use of connection pooling (keep-alive)."""
+        if self._session is None or self._session.closed:
+            self._session = create_aiohttp_session()
+        return self._session
+
+    async def close(self) -> None:
+        """Close the HTTP session of this service."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
     @abstractmethod
     async def get_suggestions(
         self, bib_entry: Dict[str, str], max_suggestions: int
@@ -27,96 +151,171 @@ class LookupService(ABC):
 
 
 class DBLPLookupService(LookupService):
+    NAME: str = "dblp"
     QUERY_TEMPLATE: str = "https://dblp.org/search/publ/api?format=bibtex&h={0}&q={1}"
 
     async def get_suggestions(
         self, bib_entry: Dict[str, str], max_suggestions: int
     ) -> List[Dict[str, str]]:
-        bibparser = bibtexparser.bparser.BibTexParser(ignore_nonstandard_types=False)
-
-        normalized_title = urllib.parse.quote_plus(ut.cleanup_title(bib_entry["title"]))
+        normalized_title = _encoded_title(bib_entry["title"])
         request_url = DBLPLookupService.QUERY_TEMPLATE.format(
             max_suggestions, normalized_title
         )
-        async with _create_aiohttp_session() as session:
-            async with session.get(request_url) as response:
-                if response.status == 200:
-                    response_data = await response.text()
-                    potential_items = bibtexparser.loads(
-                        response_data, bibparser).entries
-                    return potential_items
-                else:
-                    warnings.warn(
-                        f"Unknown error occurred. Status code {response.status}."
-                    )
-                    return []
-
-
-def _create_aiohttp_session() -> aiohttp.ClientSession:
-    ssl_context = ssl.create_default_context(cafile=certifi.where())
-    connector = aiohttp.TCPConnector(ssl=ssl_context)
-    return aiohttp.ClientSession(connector=connector)
+        session = await self._get_session()
+        async with session.get(request_url) as response:
+            if response.status == 200:
+                response_data = await response.text()
+                potential_items = ut.parse_bibtex_entries(response_data)
+                return potential_items
+            else:
+                warnings.warn(
+                    f"Unknown error occurred. Status code {response.status}."
+                )
+                return []
 
 
 class CrossrefLookupService(LookupService):
+    NAME: str = "crossref"
     QUERY_TEMPLATE: str = "https://api.crossref.org/v1/works?rows={0}&query.title={1}"
     BIBTEX_QUERY_TEMPLATE: str = "https://api.crossref.org/v1/works/{0}/transform"
+    # Maps Crossref work types to BibTeX entry types and the field that holds the
+    # name of the container (journal, proceedings, book) of the work.
+    ENTRY_TYPES: Dict[str, tuple[str, Optional[str]]] = {
+        "journal-article": ("article", "journal"),
+        "proceedings-article": ("inproceedings", "booktitle"),
+        "book-chapter": ("incollection", "booktitle"),
+        "book-section": ("incollection", "booktitle"),
+        "book": ("book", None),
+        "edited-book": ("book", None),
+        "monograph": ("book", None),
+        "dissertation": ("phdthesis", None),
+        "report": ("techreport", None),
+    }
 
-    async def __load_bibtex(self, doi: str) -> Optional[dict[str, str]]:
-        bibparser = bibtexparser.bparser.BibTexParser(ignore_nonstandard_types=False)
+    def __init__(self, n_parallel_requests: int = 5) -> None:
+        super().__init__()
+        self.n_parallel_requests = n_parallel_requests
+        self._semaphore: Optional[asyncio.Semaphore] = None
 
+    def __item_to_bibtex(self, item: Dict[str, Any]) -> Optional[dict[str, str]]:
+        """Convert a work returned by the Crossref search API to a BibTeX entry.
+
+        Args:
+            item (Dict[str, Any]): The work as returned by the Crossref API.
+
+        Returns:
+            Optional[dict[str, str]]: The BibTeX entry or None if the work lacks
+                required information.
+        """
+        titles = item.get("title")
+        authors = [
+            " ".join(n for n in (a.get("given"), a.get("family")) if n)
+            for a in item.get("author", [])
+        ]
+        authors = [a for a in authors if a]
+        date_parts = item.get("issued", {}).get("date-parts", [[None]])
+        year = date_parts[0][0] if date_parts and date_parts[0] else None
+        if not titles or not authors or year is None or "DOI" not in item:
+            return None
+
+        entry_type, container_field = CrossrefLookupService.ENTRY_TYPES.get(
+            item.get("type", ""), ("misc", None)
+        )
+        family_name = item["author"][0].get("family", "") or authors[0]
+        entry = {
+            "ENTRYTYPE": entry_type,
+            "ID": "{0}_{1}".format(
+                "".join(c for c in family_name if c.isalnum()), year
+            ),
+            "title": titles[0],
+            "author": " and ".join(authors),
+            "year": str(year),
+            "doi": item["DOI"],
+            "url": item.get("URL", f"http://dx.doi.org/{item['DOI']}"),
+        }
+        if container_field is not None and item.get("container-title"):
+            entry[container_field] = item["container-title"][0]
+        for field, key in (
+            ("publisher", "publisher"),
+            ("volume", "volume"),
+            ("number", "issue"),
+            ("pages", "page"),
+        ):
+            if key in item:
+                entry[field] = item[key]
+        return entry
+
+    async def __get_bibtex(self, item: Dict[str, Any]) -> Optional[dict[str, str]]:
+        """Get the BibTeX entry for a work returned by the Crossref search API,
+        only requesting it separately if the work lacks required information."""
+        entry = self.__item_to_bibtex(item)
+        if entry is not None:
+            return entry
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.n_parallel_requests)
+        async with self._semaphore:
+            return await self.__load_bibtex(item["DOI"])
+
+    async def __load_bibtex(self, doi: str) -> Optional[dict[str, str]]:
         encoded_doi = urllib.parse.quote_plus(doi)
         request_url = CrossrefLookupService.BIBTEX_QUERY_TEMPLATE.format(encoded_doi)
-        async with _create_aiohttp_session() as session:
-            async with session.get(
-                    request_url,
-                    headers={
-                        "Accept": "application/x-bibtex",
-                        "Accept-Encoding": "gzip, deflate, br",
-                    }) as response:
-
-                if response.status == 200:
-                    response_data = await response.text()
-                    entries = bibtexparser.loads(response_data, bibparser).entries
-                    # Sometimes, online services such as Crossref return invalid
-                    # BibTeX entries.
-                    if len(entries) > 0:
-                        return entries[0]
-                    else:
-                        warnings.warn("No valid BibTeX entry found.")
-                        return None
+        session = await self._get_session()
+        async with session.get(
+                request_url,
+                headers={
+                    "Accept": "application/x-bibtex",
+                    "Accept-Encoding": "gzip, deflate, br",
+                }) as response:
+
+            if response.status == 200:
+                response_data = await response.text()
+                entries = ut.parse_bibtex_entries(response_data)
+                # Sometimes, online services such as Crossref return invalid
+                # BibTeX entries.
+                if len(entries) > 0:
+                    return entries[0]
                 else:
-                    warnings.warn(
-                        f"Unknown error occurred. Status code {response.status}."
-                    )
+                    warnings.warn("No valid BibTeX entry found.")
                     return None
+            else:
+                warnings.warn(
+                    f"Unknown error occurred. Status code {response.status}."
+                )
+                return None
 
     async def get_suggestions(
         self, bib_entry: Dict[str, str], max_suggestions: int
     ) -> List[Dict[str, str]]:
-        normalized_title = urllib.parse.quote_plus(ut.cleanup_title(bib_entry["title"]))
+        normalized_title = _encoded_title(bib_entry["title"])
         request_url = CrossrefLookupService.QUERY_TEMPLATE.format(
             max_suggestions, normalized_title
         )
 
-        async with _create_aiohttp_session() as session:
-            async with session.get(request_url) as response:
-                if response.status == 200:
-                    response_data = await response.json()
-                    raw_potential_items = response_data["message"]["items"]
-                    unique_dois = list(set([it["DOI"] for it in raw_potential_items]))
-                    potential_items = [self.__load_bibtex(doi) for doi in unique_dois]
-                    potential_items = await asyncio.gather(*potential_items)
-
-                    used_dois = set()
-                    filtered_potential_items = []
-                    for pi in potential_items:
-                        if pi is None:
-                            continue
-                        if pi["doi"] in used_dois:
-                            continue
-                        else:
-                            used_dois.add(pi["doi"])
-                            filtered_potential_items.append(pi)
-
-                    return filtered_potential_items
+        session = await self._get_session()
+        async with session.get(request_url) as response:
+            if response.status == 200:
+                response_data = await response.json()
+                raw_potential_items = response_data["message"]["items"]
+                # DOIs are case-insensitive, so normalize them before deduplicating
+                # to avoid requesting the same entry more than once.
+                unique_items: Dict[str, Dict[str, Any]] = {}
+                for it in raw_potential_items:
+                    unique_items.setdefault(it["DOI"].lower(), it)
+                potential_items = await asyncio.gather(
+                    *[self.__get_bibtex(it) for it in unique_items.values()]
+                )
+
+                # The DOIs of the returned entries might still coincide.
+                filtered_potential_items: Dict[str, Dict[str, str]] = {}
+                for pi in potential_items:
+                    if pi is not None:
+                        doi = pi.get("doi", pi["ID"]).lower()
+                        filtered_potential_items.setdefault(doi, pi)
+
+                return list(filtered_potential_items.values())
+            else:
+                warnings.warn(
+                    f"Unknown error occurred. Status code {response.status}."
+                )
+                return []
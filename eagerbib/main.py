@@ -1,12 +1,14 @@
 import asyncio
+import dataclasses
 import glob
-import gzip
+import io
 import itertools
 import json
+import mmap
 import os
+import re
 import sys
-from typing import Optional
-import copy
+from typing import Any, Optional
 import multiprocessing as mp
 
 import bibtexparser
@@ -19,22 +21,232 @@ import eagerbib.manual_reference_updater as mru
 import eagerbib.output_processor as op
 import eagerbib.utils as ut
 
+# Optional dependencies for a faster (de)serialization of the bibliography cache.
+# ISA-L's gzip implementation is a drop-in replacement that is considerably faster.
+try:
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+__ZSTD_ERRORS = () if zstandard is None else (zstandard.ZstdError,)
+# Optional dependencies for matching near-identical titles offline.
+try:
+    import numpy as np
+    import rapidfuzz
+except ImportError:
+    rapidfuzz = None
+# Optional, POSIX-only dependency for a faster event loop of the online lookup.
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Pattern to split the authors of a BibTeX entry.
+__AUTHOR_SEPARATOR_PATTERN = re.compile(r"\s+and\s+")
+
+# Version of the layout of the bibliography cache and of the normalization of the
+# titles it is indexed by; caches of other versions are rebuilt.
+__CACHE_SCHEMA_VERSION = 5
+
+
+@dataclasses.dataclass
+class ReferenceBibliography:
+    """The reference bibliography stored as parallel lists of the normalized titles
+    and the entries, together with an index mapping the titles to their position.
 
-def __parse_bibtex_file(fn: str) -> dict[str, dict[str, str]]:
-    bibparser = bibtexparser.bparser.BibTexParser(ignore_nonstandard_types=False)
-    bibparser.expect_multiple_parse = False
+    Args:
+        titles (list[str]): The normalized titles of the entries.
+        entries (list[dict[str, str]]): The entries.
+    """
+
+    titles: list[str]
+    entries: list[dict[str, str]]
+    index: dict[str, int] = dataclasses.field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.index = {title: i for i, title in enumerate(self.titles)}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, title: str) -> Optional[dict[str, str]]:
+        """Get the entry with the given normalized title.
+
+        Args:
+            title (str): The normalized title.
+
+        Returns:
+            Optional[dict[str, str]]: The entry or None if there is none.
+        """
+        idx = self.index.get(title)
+        return self.entries[idx] if idx is not None else None
+
+    @classmethod
+    def from_cache(cls, cache: dict[str, Any]) -> "ReferenceBibliography":
+        """Create the bibliography from a loaded cache, including legacy ones that
+        store a single dictionary mapping the titles to the entries.
+
+        Args:
+            cache (dict[str, Any]): The loaded cache.
+
+        Returns:
+            ReferenceBibliography: The bibliography.
+        """
+        if "files" in cache:
+            return cls.from_files(cache["files"])
+        if "bibliographies" in cache:
+            return cls(
+                list(cache["bibliographies"].keys()),
+                list(cache["bibliographies"].values()),
+            )
+        return cls(cache["titles"], cache["entries"])
+
+    @classmethod
+    def from_files(cls, files: dict[str, dict[str, Any]]) -> "ReferenceBibliography":
+        """Create the bibliography by merging the entries of multiple files.
 
-    with open(fn, "r") as f:
-        bibtexparser.load(f, bibparser)
+        Args:
+            files (dict[str, dict[str, Any]]): The titles and entries of each file
+                indexed by the file name.
+
+        Returns:
+            ReferenceBibliography: The bibliography.
+        """
+        # Merge the files in a fixed order, so that the same entry is chosen for
+        # duplicate titles in every run.
+        bibliographies = {}
+        for name in sorted(files):
+            bibliographies.update(zip(files[name]["titles"], files[name]["entries"]))
+        return cls(list(bibliographies.keys()), list(bibliographies.values()))
+
+
+def __parse_bibtex_text(text: str) -> dict[str, dict[str, str]]:
+    # The reference files are well-formed (e.g., exported from dblp), so use the
+    # much faster lightweight parser instead of bibtexparser.
+    entries = ut.parse_bibtex_entries(text)
 
     bibliographies = {}
-    for entry in bibparser.bib_database.entries:
+    for entry in entries:
         bibliographies[ut.cleanup_title(entry["title"])] = entry
 
     return bibliographies
 
 
-def load_reference_bibliography(bibliography_dir: str) -> dict[str, list[str]]:
+def __hash_and_parse_indexed_bibtex_file(
+    indexed_fn: tuple[int, str, Optional[str]]
+) -> tuple[int, str, Optional[dict[str, dict[str, str]]]]:
+    """Hash a BibTeX file and parse it unless its hash is the given one, reading the
+    file only once for both.
+
+    Args:
+        indexed_fn (tuple[int, str, Optional[str]]): The index and path of the file
+            and the hash of its cached entries, if any.
+
+    Returns:
+        tuple[int, str, Optional[dict[str, dict[str, str]]]]: The index and hash of
+            the file, and its entries indexed by their normalized titles or None if
+            the hash is unchanged.
+    """
+    idx, fn, cached_hash = indexed_fn
+    with open(fn, "rb") as f:
+        data = f.read()
+    file_hash = ut.get_fast_hash_bytes(data)
+    if file_hash == cached_hash:
+        return idx, file_hash, None
+    # Decode the same way as opening the file in text mode does.
+    text = io.TextIOWrapper(io.BytesIO(data)).read()
+    return idx, file_hash, __parse_bibtex_text(text)
+
+
+def __read_bibliography_cache(bibliography_dir: str) -> Optional[dict[str, Any]]:
+    """Read the bibliography cache, preferring the zstd- over the gzip-compressed one.
+
+    Args:
+        bibliography_dir (str): Path to the folder containing the cache.
+
+    Returns:
+        Optional[dict[str, Any]]: The cache or None if it does not exist or could not
+            be read.
+    """
+    cache_fn = os.path.join(bibliography_dir, ut.BIBLIOGRAPHY_CACHE_FN)
+    legacy_cache_fn = os.path.join(bibliography_dir, ut.LEGACY_BIBLIOGRAPHY_CACHE_FN)
+    try:
+        if zstandard is not None and os.path.exists(cache_fn):
+            # Decompress directly from the page cache instead of copying the
+            # compressed file into memory first.
+            with open(cache_fn, "rb") as cache_f, mmap.mmap(
+                cache_f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as cache_mm:
+                data = zstandard.ZstdDecompressor().decompress(cache_mm)
+        elif os.path.exists(legacy_cache_fn):
+            with gzip.open(legacy_cache_fn, "rb") as cache_f:
+                data = cache_f.read()
+        else:
+            return None
+        # Both parsers accept the UTF-8 encoded bytes directly.
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    except (OSError, EOFError, ValueError, *__ZSTD_ERRORS):
+        print("Failed to load cache.json as the file appears corrupted.")
+        return None
+
+
+def __write_bibliography_cache(bibliography_dir: str, cache: dict[str, Any]) -> None:
+    """Write the bibliography cache, zstd-compressed if possible.
+
+    Args:
+        bibliography_dir (str): Path to the folder to store the cache in.
+        cache (dict[str, Any]): The cache.
+    """
+    cache_fn = os.path.join(bibliography_dir, ut.BIBLIOGRAPHY_CACHE_FN)
+    legacy_cache_fn = os.path.join(bibliography_dir, ut.LEGACY_BIBLIOGRAPHY_CACHE_FN)
+    if zstandard is not None:
+        target_fn, obsolete_cache_fn = cache_fn, legacy_cache_fn
+    else:
+        target_fn, obsolete_cache_fn = legacy_cache_fn, cache_fn
+
+    # Write to a temporary file first and then replace the cache with it, so that
+    # an interrupted write does not leave a corrupted cache behind.
+    tmp_fn = f"{target_fn}.{os.getpid()}.tmp"
+    try:
+        if zstandard is not None:
+            # Stream the serialized cache into the compressor instead of building
+            # the compressed copy in memory as well. Passing the size stores it in
+            # the frame header, which is required for decompressing it in one go.
+            if orjson is not None:
+                data = orjson.dumps(cache)
+            else:
+                data = json.dumps(cache).encode("utf-8")
+            compressor = zstandard.ZstdCompressor(level=6)
+            with open(tmp_fn, "wb") as cache_f:
+                with compressor.stream_writer(cache_f, size=len(data)) as writer:
+                    writer.write(data)
+        else:
+            with gzip.open(tmp_fn, "wb") as cache_f:
+                if orjson is not None:
+                    cache_f.write(orjson.dumps(cache))
+                else:
+                    # Let json encode the cache chunk-wise directly into the file.
+                    with io.TextIOWrapper(cache_f, encoding="utf-8") as text_f:
+                        json.dump(cache, text_f)
+        os.replace(tmp_fn, target_fn)
+    finally:
+        if os.path.exists(tmp_fn):
+            os.remove(tmp_fn)
+    # Remove the cache stored in the other format, as it is outdated now.
+    if os.path.exists(obsolete_cache_fn):
+        os.remove(obsolete_cache_fn)
+
+
+def load_reference_bibliography(bibliography_dir: str) -> ReferenceBibliography:
     """Loads a list of bibliographies from a list of files stored in a text file.
 
     Args:
@@ -42,63 +254,215 @@ def load_reference_bibliography(bibliography_dir: str) -> dict[str, list[str]]:
             in the BibTeX format.
 
     Returns:
-        dict[str, list[str]]: A dictionary mapping the id to its bibliography entry,
-         line by line.
+        ReferenceBibliography: The bibliography entries indexed by their normalized
+            titles.
     """
-    # Check if a cache.json file exists in the bibliography folder and if so, use this
+    # Check if a cache file exists in the bibliography folder and if so, use this
     # one.
-    cache_fn = os.path.join(bibliography_dir, "cache.json.gz")
     filenames = glob.glob(os.path.join(bibliography_dir, "*.bib"))
-    current_hashes = {os.path.basename(fn): ut.get_md5_hash(fn) for fn in filenames}
-    if os.path.exists(cache_fn):
-        with gzip.open(cache_fn, "r") as cache_f:
-            try:
-                cache = json.loads(cache_f.read().decode("utf-8"))
-            except json.decoder.JSONDecodeError:
-                print("Failed to load cache.json as the file appears corrupted.")
-            else:
-                if len(current_hashes) == 0:
-                    print(
-                        "No BibTeX files found in the bibliography folder. "
-                        "Using pre-built cache."
-                    )
-                    return cache["bibliographies"]
+    cache = __read_bibliography_cache(bibliography_dir)
+    if cache is not None and len(filenames) == 0:
+        print(
+            "No BibTeX files found in the bibliography folder. "
+            "Using pre-built cache."
+        )
+        reference_bibliography = ReferenceBibliography.from_cache(cache)
+        if cache.get("schema_version") != __CACHE_SCHEMA_VERSION:
+            # Older versions normalized some titles differently.
+            reference_bibliography = ReferenceBibliography(
+                [ut.cleanup_title(e["title"]) for e in reference_bibliography.entries],
+                reference_bibliography.entries,
+            )
+        return reference_bibliography
+    elif len(filenames) == 0:
+        # Do not save an empty cache, as it would be used as a pre-built cache by
+        # later runs.
+        print("No BibTeX files or pre-built cache found in the bibliography folder.")
+        return ReferenceBibliography.from_files({})
+
+    # The cache stores the entries of each file separately, so that only the files
+    # that have changed since the cache was built need to be parsed again.
+    cached_files: dict[str, dict[str, Any]] = {}
+    if cache is not None and cache.get("schema_version") == __CACHE_SCHEMA_VERSION:
+        cached_files = cache["files"]
+    files: dict[str, dict[str, Any]] = {}
+
+    # If the size and modification time of a file are unchanged, its cached
+    # entries are used without reading the file at all.
+    changed_filenames = []
+    for fn in filenames:
+        name = os.path.basename(fn)
+        stat = os.stat(fn)
+        stats = [stat.st_size, stat.st_mtime_ns]
+        if name in cached_files and cached_files[name]["stats"] == stats:
+            files[name] = cached_files[name]
+        else:
+            files[name] = {"stats": stats}
+            changed_filenames.append(fn)
+
+    # Otherwise, check if the hash of its contents is consistent with the one used
+    # to generate the cache, and only parse it if not. Both happen in the worker
+    # processes, so that each file is read only once.
+    if len(changed_filenames) > 0:
+        print(
+            "Updating bibliography cache as eagerbib database has been updated "
+            "recently."
+        )
+        n_processes = max(1, mp.cpu_count() - 1)
+        n_entries = 0
+        with mp.Pool(n_processes) as pool:
+            # Process the files in chunks and in any order to reduce the IPC
+            # overhead.
+            pbar = tqdm(
+                pool.imap_unordered(
+                    __hash_and_parse_indexed_bibtex_file,
+                    [
+                        (
+                            i,
+                            fn,
+                            cached_files.get(os.path.basename(fn), {}).get("hash"),
+                        )
+                        for i, fn in enumerate(changed_filenames)
+                    ],
+                    chunksize=max(1, len(changed_filenames) // (n_processes * 4)),
+                ),
+                desc="Parsing and preprocessing BibTeX files.",
+                total=len(changed_filenames),
+                dynamic_ncols=True)
+            for i, file_hash, d in pbar:
+                name = os.path.basename(changed_filenames[i])
+                files[name]["hash"] = file_hash
+                if d is None:
+                    files[name] |= {
+                        "titles": cached_files[name]["titles"],
+                        "entries": cached_files[name]["entries"],
+                    }
+                    continue
+                files[name] |= {"titles": list(d.keys()), "entries": list(d.values())}
+                n_entries += len(d)
+                pbar.set_postfix_str("Processed {0} entries.".format(n_entries))
+    elif cache is not None:
+        print("Using cached pre-processed BibTex entries.")
+
+    # Only save the cache if it has changed, or to migrate caches stored in the
+    # legacy format.
+    if (
+        len(changed_filenames) > 0
+        or files.keys() != cached_files.keys()
+        or (
+            zstandard is not None
+            and not os.path.exists(
+                os.path.join(bibliography_dir, ut.BIBLIOGRAPHY_CACHE_FN)
+            )
+        )
+    ):
+        __write_bibliography_cache(
+            bibliography_dir,
+            {"schema_version": __CACHE_SCHEMA_VERSION, "files": files},
+        )
+        if len(changed_filenames) > 0:
+            print("Saved pre-processed BibTex entries.")
 
-                # Check if the hashes of the current files are consistent with those
-                # used to generate cache.json
-                cache_hashes = cache["bib_hashes"]
-                # If the hashes are consistent, return the cached bibliographies.
-                if cache_hashes == current_hashes:
-                    print("Using cached pre-processed BibTex entries.")
-                    return cache["bibliographies"]
-                # Otherwise, build new cache from scratch and overwrite the old one.
+    return ReferenceBibliography.from_files(files)
 
-    print("Updating bibliography cache as eagerbib database has been updated recently.")
 
-    bibliographies = {}
+def __find_fuzzy_matches(
+    titles: list[str],
+    offline_bibliography: ReferenceBibliography,
+    threshold: float,
+    max_candidates: int = 5,
+    max_scores: int = 2**22,
+) -> list[list[tuple[int, float]]]:
+    """Find the most similar titles of the reference bibliography.
 
-    with mp.Pool(max(1, mp.cpu_count() - 1)) as pool:
-        pbar = tqdm(
-            pool.imap(__parse_bibtex_file, filenames),
-            desc="Parsing and preprocessing BibTeX files.",
-            total=len(filenames),
-            dynamic_ncols=True)
-        for d in pbar:
-            bibliographies |= d
-            pbar.set_postfix_str(
-                "Processed {0} entries.".format(len(bibliographies))
-            )
+    The similarities of all pairs of titles are computed in bulk (multi-threaded) by
+    rapidfuzz. To bound the memory usage, the titles are processed in chunks.
+
+    Args:
+        titles (list[str]): The normalized titles to find matches for.
+        offline_bibliography (ReferenceBibliography): The reference bibliography.
+        threshold (float): The minimum similarity (0-100) of a match.
+        max_candidates (int, optional): The maximum number of candidates returned
+            per title. Defaults to 5.
+        max_scores (int, optional): The maximum number of similarities to compute
+            at once. Defaults to 2**22.
 
-    # Save the cache.
-    with gzip.open(cache_fn, "w") as cache_f:
-        cache_f.write(
-            json.dumps(
-                {"bib_hashes": current_hashes, "bibliographies": bibliographies}
-            ).encode("utf-8")
+    Returns:
+        list[list[tuple[int, float]]]: For each title, the indices of the reference
+            entries with a sufficiently similar title and their similarities, sorted
+            by decreasing similarity and then by index.
+    """
+    if len(titles) == 0 or len(offline_bibliography) == 0:
+        return [[] for _ in titles]
+
+    # Use the plain similarity rather than a token set based one, as the latter
+    # considers a title a perfect match for any title containing it.
+    process = rapidfuzz.utils.default_process
+    choices = [process(t) for t in offline_bibliography.titles]
+    queries = [process(t) for t in titles]
+    chunk_size = max(1, max_scores // len(choices))
+    matches: list[list[tuple[int, float]]] = []
+    for i in range(0, len(queries), chunk_size):
+        scores = rapidfuzz.process.cdist(
+            queries[i : i + chunk_size],
+            choices,
+            scorer=rapidfuzz.fuzz.ratio,
+            score_cutoff=threshold,
+            dtype=np.float32,
+            workers=-1,
         )
-    print("Saved pre-processed BibTex entries.")
+        for row in scores:
+            candidates = np.flatnonzero(row >= threshold)
+            # Sort by decreasing similarity; the stable sort keeps ties in the order
+            # of the reference bibliography.
+            candidates = candidates[np.argsort(-row[candidates], kind="stable")]
+            matches.append(
+                [(int(c), float(row[c])) for c in candidates[:max_candidates]]
+            )
+    return matches
 
-    return bibliographies
+
+def __get_first_author_surname(entry: dict[str, str]) -> str:
+    """Get the normalized surname of the first author of an entry.
+
+    Args:
+        entry (dict[str, str]): The entry.
+
+    Returns:
+        str: The lowercased surname without non-alphanumeric characters or an empty
+            string if the entry has no author.
+    """
+    first_author = __AUTHOR_SEPARATOR_PATTERN.split(entry.get("author", ""))[0]
+    if "," in first_author:
+        surname = first_author.split(",")[0]
+    else:
+        surname = (first_author.split() or [""])[-1]
+    return "".join(ut.cleanup_title(surname).split()).lower()
+
+
+def __metadata_agrees(entry: dict[str, str], candidate: dict[str, str]) -> bool:
+    """Check whether the year and first author of a candidate agree with an entry.
+
+    Values missing in either entry are ignored, but at least one of them has to
+    be present in both and agree.
+
+    Args:
+        entry (dict[str, str]): The entry.
+        candidate (dict[str, str]): The candidate for the entry.
+
+    Returns:
+        bool: True if no value differs and at least one value agrees.
+    """
+    n_agreeing = 0
+    for value, candidate_value in (
+        (entry.get("year", "").strip(), candidate.get("year", "").strip()),
+        (__get_first_author_surname(entry), __get_first_author_surname(candidate)),
+    ):
+        if value and candidate_value:
+            if value != candidate_value:
+                return False
+            n_agreeing += 1
+    return n_agreeing > 0
 
 
 def load_input_bibliography(input_fn: str) -> BibDatabase:
@@ -118,6 +482,8 @@ def process_bibliography_online(
     input_bibliography: list[dict[str, str]],
     config: cfg.OnlineUpdaterConfig,
     buffer_size: int = 15,
+    cleaned_titles: Optional[list[str]] = None,
+    offline_suggestions: Optional[list[list[dict[str, str]]]] = None,
 ) -> list[op.BaseProcessingCommand]:
     """Processes the input bibliography using online lookup services.
 
@@ -125,64 +491,144 @@ def process_bibliography_online(
         input_bibliography (list[dict[str, str]]): The input bibliography.
         config (cfg.OnlineUpdaterConfig): The configuration for the online updater.
         buffer_size (int, optional): The size of the buffer. Defaults to 15.
+        cleaned_titles (Optional[list[str]], optional): The normalized titles of the
+            input bibliography items. Computed if not given. Defaults to None.
+        offline_suggestions (Optional[list[list[dict[str, str]]]], optional): For each
+            input bibliography item, entries found offline to suggest in addition to
+            the online ones. If the online updater is disabled, only the items with
+            such suggestions are shown. Defaults to None.
     """
+    if cleaned_titles is None:
+        cleaned_titles = [
+            ut.cleanup_title(it.get("title", "")) for it in input_bibliography
+        ]
+    if offline_suggestions is None:
+        offline_suggestions = [[] for _ in input_bibliography]
+
+    output_commands: list[op.BaseProcessingCommand] = []
     if not config.enable:
-        return [op.KeepItemProcessingCommand(it) for it in input_bibliography]
+        # Without online lookups, only the items with offline suggestions need to be
+        # reviewed.
+        reviewed_items = []
+        for item in zip(input_bibliography, cleaned_titles, offline_suggestions):
+            if len(item[2]) > 0:
+                reviewed_items.append(item)
+            else:
+                output_commands.append(op.KeepItemProcessingCommand(item[0]))
+        if len(reviewed_items) == 0:
+            return output_commands
+        input_bibliography, cleaned_titles, offline_suggestions = map(
+            list, zip(*reviewed_items)
+        )
 
     n_parallel: int = config.n_parallel_requests
 
     lookup_services: list[lus.LookupService] = []
-    for service in list(set(config.services)):
+    for service in list(set(config.services)) if config.enable else []:
         if service == "dblp":
             lookup_services.append(lus.DBLPLookupService())
         elif service == "crossref":
-            lookup_services.append(lus.CrossrefLookupService())
+            lookup_services.append(lus.CrossrefLookupService(n_parallel))
         else:
             raise ValueError(f"Unknown service: {service}.")
 
-    def get_reference_from_dict(entry: dict[str, str]) -> mru.Reference:
+    def get_reference_from_dict(
+        entry: dict[str, str], cleaned_title: Optional[str] = None
+    ) -> mru.Reference:
+        if cleaned_title is None:
+            cleaned_title = ut.cleanup_title(entry.get("title", ""))
         return mru.Reference(
             int(entry.get("year", 0)),
-            ut.cleanup_title(entry.get("title", "")),
+            cleaned_title,
             ut.cleanup_author(entry.get("author", "")),
             entry,
         )
 
-    async def get_online_suggestions(entry: dict[str, str]) -> list[dict[str, str]]:
+    # Cache the suggestions across runs, as looking them up is slow.
+    suggestion_cache: Optional[lus.SuggestionCache] = None
+    if len(lookup_services) > 0 and config.cache_ttl_days > 0:
+        suggestion_cache = lus.SuggestionCache(
+            os.path.join(ut.get_default_cache_directory(), "online_lookup.sqlite"),
+            config.cache_ttl_days * 24 * 60 * 60,
+        )
+
+    async def get_service_suggestions(
+        service: lus.LookupService, entry: dict[str, str], cleaned_title: str
+    ) -> list[dict[str, str]]:
+        if suggestion_cache is not None:
+            suggestions = suggestion_cache.get(
+                service.NAME, cleaned_title, config.n_suggestions
+            )
+            if suggestions is not None:
+                return suggestions
+        suggestions = await service.get_suggestions(entry, config.n_suggestions)
+        # Empty results are not cached, as they are also returned for failed
+        # requests.
+        if suggestion_cache is not None and len(suggestions) > 0:
+            suggestion_cache.set(
+                service.NAME, cleaned_title, config.n_suggestions, suggestions
+            )
+        return suggestions
+
+    async def get_online_suggestions(
+        entry: dict[str, str], cleaned_title: str
+    ) -> list[dict[str, str]]:
         suggestions = [
-            lus.get_suggestions(entry, config.n_suggestions) for lus in lookup_services
+            get_service_suggestions(ls, entry, cleaned_title) for ls in lookup_services
         ]
         return list(itertools.chain(*await asyncio.gather(*suggestions)))
 
     async def get_reference_choice_task(
-        entry: dict[str, str]
+        entry: dict[str, str],
+        cleaned_title: str,
+        entry_offline_suggestions: list[dict[str, str]],
     ) -> mru.ReferenceChoiceTask:
-        suggestions = await get_online_suggestions(entry)
+        suggestions = entry_offline_suggestions + await get_online_suggestions(
+            entry, cleaned_title
+        )
 
         suggestions = [
             s for s in suggestions if "journal" not in s or s["journal"] != "CoRR"
         ]
 
         srs = [get_reference_from_dict(s) for s in suggestions]
-        cr = get_reference_from_dict(entry)
+        cr = get_reference_from_dict(entry, cleaned_title)
 
         return mru.ReferenceChoiceTask(cr, srs)
 
     async def produce(queue: asyncio.Queue) -> None:
-        # Add first rct separately to avoid waiting times at the beginning.
-        await queue.put(await get_reference_choice_task(input_bibliography[0]))
-        for entry_chunks in ut.chunk_iterable(input_bibliography[1:], n_parallel):
-            rcts = await asyncio.gather(
-                *[
-                    get_reference_choice_task(entry)
-                    for entry in entry_chunks
-                    if entry is not None
-                ]
+        pending: set[asyncio.Task] = set()
+        try:
+            entries = list(
+                zip(input_bibliography, cleaned_titles, offline_suggestions)
             )
-            for rct in rcts:
-                await queue.put(rct)
+            # Add first rct separately to avoid waiting times at the beginning.
+            if len(entries) > 0:
+                await queue.put(await get_reference_choice_task(*entries[0]))
+            # Keep up to n_parallel lookups running and hand over each result as soon
+            # as it is available, so that a single slow request does not stall the
+            # others. No new lookups are started while the queue is full.
+            remaining_entries = iter(entries[1:])
+            while True:
+                for entry in itertools.islice(
+                    remaining_entries, n_parallel - len(pending)
+                ):
+                    pending.add(
+                        asyncio.create_task(get_reference_choice_task(*entry))
+                    )
+                if len(pending) == 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    await queue.put(task.result())
 
-        await queue.put(None)
+            await queue.put(None)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*[ls.close() for ls in lookup_services])
 
     async def get_reference_choice_task_generator(queue: asyncio.Queue):
         while True:
@@ -198,9 +644,12 @@ def process_bibliography_online(
         produce(queue),
         len(input_bibliography),
     )
-    choices: Optional[list[mru.ReferenceChoice]] = mrfua.run()
+    try:
+        choices: Optional[list[mru.ReferenceChoice]] = mrfua.run()
+    finally:
+        if suggestion_cache is not None:
+            suggestion_cache.close()
 
-    output_commands: list[op.BaseProcessingCommand] = []
     if choices is None:
         sys.exit()
 
@@ -221,42 +670,96 @@ def process_bibliography_online(
     return output_commands
 
 
+def find_fuzzy_suggestions(
+    input_bibliography: list[dict[str, str]],
+    offline_bibliography: ReferenceBibliography,
+    threshold: float,
+    cleaned_titles: Optional[list[str]] = None,
+) -> list[list[dict[str, str]]]:
+    """Find reference entries with titles similar to those of the input items.
+
+    Similar titles often belong to different papers (e.g., follow-up work), so the
+    candidates are only meant to be suggested to the user. Candidates whose year or
+    first author contradicts the input item are discarded.
+
+    Args:
+        input_bibliography (list[dict[str, str]]): The input bibliography.
+        offline_bibliography (ReferenceBibliography): The reference bibliography.
+        threshold (float): The minimum similarity (0-100) of the titles. Set to 0 to
+            disable fuzzy matching.
+        cleaned_titles (Optional[list[str]], optional): The normalized titles of the
+            input bibliography items. Computed if not given. Defaults to None.
+
+    Returns:
+        list[list[dict[str, str]]]: For each input item, the suggested entries sorted
+            by decreasing similarity. All lists are empty if fuzzy matching is
+            disabled or rapidfuzz is not installed.
+    """
+    if threshold <= 0 or rapidfuzz is None:
+        return [[] for _ in input_bibliography]
+
+    if cleaned_titles is None:
+        cleaned_titles = [ut.cleanup_title(ir["title"]) for ir in input_bibliography]
+
+    fuzzy_matches = __find_fuzzy_matches(
+        cleaned_titles, offline_bibliography, threshold
+    )
+    return [
+        [
+            offline_bibliography.entries[idx]
+            for idx, _ in candidates
+            if __metadata_agrees(ir, offline_bibliography.entries[idx])
+        ]
+        for ir, candidates in zip(input_bibliography, fuzzy_matches)
+    ]
+
+
 def process_bibliography_offline(
     input_bibliography: list[dict[str, str]],
-    offline_bibliography: dict[str, dict[str, str]],
+    offline_bibliography: ReferenceBibliography,
+    cleaned_titles: Optional[list[str]] = None,
 ) -> list[op.BaseProcessingCommand]:
     """Processes the input bibliography offline.
 
     Args:
         input_bibliography (list[dict[str, str]]): The input bibliography.
-        offline_bibliography (dict[str, dict[str, str]]): The reference
-            bibliography items indexed by their normalized titles.
+        offline_bibliography (ReferenceBibliography): The reference bibliography
+            items indexed by their normalized titles.
+        cleaned_titles (Optional[list[str]], optional): The normalized titles of the
+            input bibliography items. Computed if not given. Defaults to None.
 
     Returns:
         list[op.BaseProcessingCommand]: The processing commands.
     """
+    if cleaned_titles is None:
+        cleaned_titles = [ut.cleanup_title(ir["title"]) for ir in input_bibliography]
 
     output_commands: list[op.BaseProcessingCommand] = []
-    for ir in input_bibliography:
-        mor = copy.deepcopy(
-            offline_bibliography.get(ut.cleanup_title(ir["title"]), None)
-        )
+    for ir, ct in zip(input_bibliography, cleaned_titles):
+        mor = offline_bibliography.get(ct)
         if mor is None:
             output_commands.append(op.KeepItemProcessingCommand(ir))
         else:
-            output_commands.append(op.UpdateItemProcessingCommand(ir, mor, "automated"))
+            output_commands.append(
+                op.UpdateItemProcessingCommand(ir, mor, "automated")
+            )
     return output_commands
 
 
 def main():
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     base_dir = os.path.dirname(os.path.abspath(__file__))
     config = cfg.get_config(
         cfg.MainConfig, os.path.join(base_dir, "default_config.yaml")
     )
     reference_bibliography = load_reference_bibliography(config.bibliography_folder)
     input_bibliography = load_input_bibliography(config.input)
+    # Normalize the titles only once, as they are needed by both the offline and the
+    # online processing.
+    cleaned_titles = [ut.cleanup_title(ir["title"]) for ir in input_bibliography]
     processing_commands_offline = process_bibliography_offline(
-        input_bibliography, reference_bibliography
+        input_bibliography, reference_bibliography, cleaned_titles
     )
     update_processing_commands_offline = [
         pc
@@ -265,13 +768,24 @@ def main():
     ]
 
     # Only update the bibliography online if no offline item has been found before.
-    input_bibliography_online = [
-        pc.current_item
-        for pc in processing_commands_offline
-        if isinstance(pc, op.KeepItemProcessingCommand)
-    ]
+    input_bibliography_online = []
+    cleaned_titles_online = []
+    for pc, cleaned_title in zip(processing_commands_offline, cleaned_titles):
+        if isinstance(pc, op.KeepItemProcessingCommand):
+            input_bibliography_online.append(pc.current_item)
+            cleaned_titles_online.append(cleaned_title)
+    # Entries with similar titles are only suggested in the manual updater.
+    fuzzy_suggestions = find_fuzzy_suggestions(
+        input_bibliography_online,
+        reference_bibliography,
+        config.fuzzy_match_threshold,
+        cleaned_titles_online,
+    )
     processing_commands_online = process_bibliography_online(
-        input_bibliography_online, config.online_updater
+        input_bibliography_online,
+        config.online_updater,
+        cleaned_titles=cleaned_titles_online,
+        offline_suggestions=fuzzy_suggestions,
     )
 
     processing_commands = (
@@ -3,6 +3,7 @@ import dataclasses
 import inspect
 from typing import Any, AsyncGenerator, Callable, Coroutine, Generator, Optional, Union
 
+from rich.syntax import Syntax
 from textual import events
 from textual.app import App, ComposeResult
 from textual.containers import Center, Middle, ScrollableContainer
@@ -24,6 +25,55 @@ import eagerbib.utils as ut
 
 # from textual import work
 
+# Options for highlighting the full BibTeX entry of a reference.
+_SYNTAX_KWARGS: dict[str, Any] = dict(
+    theme="material", line_numbers=False, word_wrap=True, dedent=True
+)
+
+
+def _normalize_reference_type_detail(s: str, n_limit: int = 55) -> str:
+    """Normalize a reference_type string to be displayed in the UI."""
+    s = ut.cleanup_title(s)
+
+    if len(s) > n_limit:
+        s = s[: n_limit - 3] + "..."
+    return s
+
+
+# Maps BibTeX entry types to functions that describe references of this type based
+# on their bibliography values.
+_REF_TYPE_HANDLERS: dict[str, Callable[[dict[str, str]], str]] = {
+    "inproceedings": lambda v: "Proceedings ({0})".format(
+        _normalize_reference_type_detail(v.get("booktitle", ""))
+    ),
+    "article": lambda v: "Journal article ({0})".format(
+        v.get("journal", v.get("publisher", v.get("doi", "")))
+    ),
+    "book": lambda v: "Book",
+    "incollection": lambda v: "Book chapter ({0})".format(
+        _normalize_reference_type_detail(v.get("booktitle", ""))
+    ),
+    "phdthesis": lambda v: "PhD thesis",
+    "mastersthesis": lambda v: "Master's thesis",
+    "techreport": lambda v: "Techreport",
+    "misc": lambda v: "Misc ({0})".format(
+        _normalize_reference_type_detail(v.get("howpublished", ""))
+    ),
+}
+
+
+def _get_reference_type(bibliography_values: dict[str, str]) -> str:
+    """Return a normalized string describing the type of a reference."""
+    reference_type = _REF_TYPE_HANDLERS.get(
+        bibliography_values.get("ENTRYTYPE", None), lambda v: "Other"
+    )(bibliography_values)
+
+    # Remove trailing "()" if present.
+    if reference_type.endswith("()"):
+        return reference_type[:-3]
+
+    return reference_type
+
 
 @dataclasses.dataclass
 class Reference:
@@ -31,6 +81,11 @@ class Reference:
     title: str
     author: str
     bibliography_values: dict[str, str]
+    # The description of the type of the reference shown in the UI, which is
+    # derived from the bibliography values the first time it is needed.
+    _reference_type: Optional[str] = dataclasses.field(
+        default=None, init=False, repr=False, compare=False
+    )
 
 
 @dataclasses.dataclass
@@ -91,13 +146,6 @@ async def await_me_maybe(callback, *args, **kwargs):
     return result
 
 
-async def anext_maybe(generator: Union[Generator, AsyncGenerator]) -> Optional[Any]:
-    if hasattr(generator, "__anext__"):
-        return await generator.__anext__()
-    else:
-        return next(generator)
-
-
 class ReferenceDisplay(Static):
     reference: Reactive[Optional[Reference]] = reactive(None)
     __composed = False
@@ -130,47 +178,11 @@ class ReferenceDisplay(Static):
 
     def __get_reference_type(self):
         """Return a normalized string describing the type of the reference."""
-
-        def normalize(s: str, n_limit: int = 55) -> str:
-            """Normalize a reference_type string to be displayed in the UI."""
-            s = ut.cleanup_title(s)
-
-            if len(s) > n_limit:
-                s = s[: n_limit - 3] + "..."
-            return s
-
-        recognized_reference_type_fns = {
-            "inproceedings": lambda: "Proceedings ({0})".format(
-                normalize(self.reference.bibliography_values.get("booktitle", ""))
-            ),
-            "article": lambda: "Journal article ({0})".format(
-                self.reference.bibliography_values.get(
-                    "journal",
-                    self.reference.bibliography_values.get(
-                        "publisher", self.reference.bibliography_values.get("doi", "")
-                    ),
-                )
-            ),
-            "book": lambda: "Book",
-            "incollection": lambda: "Book chapter ({0})".format(
-                normalize(self.reference.bibliography_values.get("booktitle", ""))
-            ),
-            "phdthesis": lambda: "PhD thesis",
-            "mastersthesis": lambda: "Master's thesis",
-            "techreport": lambda: "Techreport",
-            "misc": lambda: "Misc ({0})".format(
-                normalize(self.reference.bibliography_values.get("howpublished", ""))
-            ),
-        }
-        reference_type = recognized_reference_type_fns.get(
-            self.reference.bibliography_values.get("ENTRYTYPE", None), lambda: "Other"
-        )()
-
-        # Remove trailing "()" if present.
-        if reference_type.endswith("()"):
-            return reference_type[:-3]
-
-        return reference_type
+        if self.reference._reference_type is None:
+            self.reference._reference_type = _get_reference_type(
+                self.reference.bibliography_values
+            )
+        return self.reference._reference_type
 
     def compose(self) -> ComposeResult:
         year = self.reference.year if self.reference else 0
@@ -214,21 +226,12 @@ class ReferenceDisplay(Static):
             )
         if self.show_author:
             self.query_one("#author", expect_type=Label).update(self.reference.author)
-        from rich.syntax import Syntax
-
         if self.show_full_reference:
             bibtex = "\n".join(
                 op.transform_reference_dict_to_lines(self.reference.bibliography_values)
             )
             self.query_one("#full-reference", expect_type=Label).update(
-                Syntax(
-                    bibtex,
-                    "bibtex",
-                    theme="material",
-                    line_numbers=False,
-                    word_wrap=True,
-                    dedent=True,
-                )
+                Syntax(bibtex, "bibtex", **_SYNTAX_KWARGS)
             )
 
 
@@ -260,6 +263,8 @@ class ReferencePicker(Static):
         self.get_next_choice_task_fn = get_next_choice_task_fn
         self.set_choice_fn = set_choice_fn
         self.show_chosen_reference_details = show_chosen_reference_details
+        # Index of the available reference whose button has the focus, if any.
+        self._focused_idx: Optional[int] = None
 
     async def _refresh_choice_task(self) -> None:
         choice_task = await await_me_maybe(self.get_next_choice_task_fn)
@@ -332,7 +337,11 @@ class ReferencePicker(Static):
         if event._sender.parent is not None and isinstance(
             event._sender.parent.parent, ReferenceDisplay
         ):
-            chosen_reference = event._sender.parent.parent.reference
+            rfd = event._sender.parent.parent
+            references = self.query_one("#available-references").children
+            if rfd in references:
+                self._focused_idx = references.index(rfd)
+            chosen_reference = rfd.reference
             display = self.query_one("#chosen-reference", expect_type=ReferenceDisplay)
             display.reference = chosen_reference
 
@@ -353,34 +362,27 @@ class ReferencePicker(Static):
                     # This can happen if the user presses a button while the element
                     # is being composed and the button has not been added yet.
                     pass
-        elif event.key == "up":
-            rfds = self.query_one("#available-references").children
-            current_idx = len(rfds)
-            for idx, rfd in enumerate(rfds):
-                if rfd.query_one("#choose").has_focus:
-                    current_idx = idx
-                    break
-            rfds[(current_idx - 1) % len(rfds)].query_one("#choose").focus()
-        elif event.key == "down":
+        elif event.key in ("up", "down"):
             rfds = self.query_one("#available-references").children
-            current_idx = -1
-            for idx, rfd in enumerate(rfds):
-                if rfd.query_one("#choose").has_focus:
-                    current_idx = idx
-                    break
-            rfds[(current_idx + 1) % len(rfds)].query_one("#choose").focus()
+            if self._focused_idx is None:
+                # Without a focused reference, start from the last or first one.
+                idx = len(rfds) - 1 if event.key == "up" else 0
+            else:
+                idx = self._focused_idx + (-1 if event.key == "up" else 1)
+            rfds[idx % len(rfds)].query_one("#choose").focus()
 
     def watch_available_references(self) -> None:
         if not self.__composed:
             return
 
-        self.query_one("#chosen-reference-column").visible = False
+        # Swap all references at once instead of laying out the picker after each
+        # removed or added reference.
+        with self.app.batch_update():
+            self.query_one("#chosen-reference-column").visible = False
 
-        references = self.query_one("#available-references")
-        if references:
-            # while len(references.children) > 0:
-            #    references.children[0].remove()
-            references.children._clear()
+            references = self.query_one("#available-references")
+            references.remove_children()
+            self._focused_idx = None
 
             rfds = []
             for idx, rf in enumerate(self.available_references):
@@ -414,35 +416,49 @@ class ManualReferenceUpdaterApp(App):
         ],
         choice_task_generator: Optional[Coroutine[Any, Any, None]] = None,
         n_tasks: Optional[int] = None,
+        n_prefetched_tasks: int = 2,
     ):
         super().__init__()
         self.choice_task_iterator = choice_task_iterator
         self.choices: list[ReferenceChoice] = []
         self.n_tasks = n_tasks
         self.choice_task_generator = choice_task_generator
+        self.n_prefetched_tasks = n_prefetched_tasks
+        self._choice_task_queue: asyncio.Queue[Optional[ReferenceChoiceTask]]
+
+    async def _prefetch_choice_tasks(self) -> None:
+        """Move the choice tasks into a queue ahead of time, followed by None once
+        the iterator is exhausted."""
+        if hasattr(self.choice_task_iterator, "__anext__"):
+            async for choice_task in self.choice_task_iterator:
+                await self._choice_task_queue.put(choice_task)
+        else:
+            for choice_task in self.choice_task_iterator:
+                await self._choice_task_queue.put(choice_task)
+        await self._choice_task_queue.put(None)
 
     def compose(self) -> ComposeResult:
         """Create child widgets for the app."""
 
         async def get_next_choice_task_fn() -> Optional[ReferenceChoiceTask]:
-            try:
-                choice_task = await anext_maybe(self.choice_task_iterator)
-
-                pi = self.query_one("#loadingindicator", expect_type=LoadingIndicator)
-                if pi.display:
-                    pi.display = False
-                    self.query_one("#referencepicker").visible = True
-                    self.query_one("#referencepicker").focus()
-                self.query_one("#progressbar").visible = True
-
-            except (StopAsyncIteration, StopIteration):
+            choice_task = await self._choice_task_queue.get()
+            if choice_task is None:
                 self.exit(self.choices)
                 return None
-            else:
-                return choice_task
+
+            pi = self.query_one("#loadingindicator", expect_type=LoadingIndicator)
+            if pi.display:
+                pi.display = False
+                self.query_one("#referencepicker").visible = True
+                self.query_one("#referencepicker").focus()
+            self.query_one("#progressbar").visible = True
+            return choice_task
 
         if self.choice_task_generator:
             self.run_worker(self.choice_task_generator, exclusive=True)
+        # Fetch the next tasks while the user is still choosing a reference.
+        self._choice_task_queue = asyncio.Queue(maxsize=self.n_prefetched_tasks)
+        self.run_worker(self._prefetch_choice_tasks(), group="prefetch")
 
         def set_choice_fn(reference_choice: ReferenceChoice) -> None:
             self.query_one(
@@ -1,4 +1,6 @@
 import abc
+import functools
+import operator
 import re
 import sys
 from datetime import datetime
@@ -6,6 +8,15 @@ from typing import Literal, Union
 import warnings
 import eagerbib.config as cfg
 
+# Pattern to find arXiv IDs. This pattern was proposed by the rebiber authors.
+_ARXIV_PATTERN = re.compile(
+    r"(arxiv:|arxiv.org\/abs\/|arxiv.org\/pdf\/)([0-9]{4}).([0-9]{5})", re.IGNORECASE
+)
+# The fields of an entry that can contain a reference to arXiv.
+_ARXIV_FIELDS = ("journal", "booktitle", "url", "eprint", "howpublished", "note")
+# The keys of an entry that are not written as fields.
+_SKIP_KEYS = frozenset({"ENTRYTYPE", "ID"})
+
 
 class BaseProcessingCommand(abc.ABC):
     """Base class for processing commands."""
@@ -35,17 +46,20 @@ class UpdateItemProcessingCommand(BaseProcessingCommand):
     ):
         super().__init__(current_item)
 
-        # Update id/key of the new item to match the current item.
-        new_item["ID"] = current_item["ID"]
+        # The new item is often shared (e.g., an entry of the reference bibliography),
+        # so it is not modified but only copied once the output is needed.
+        self.new_item = new_item
 
         current_date = datetime.now().strftime("%Y-%m-%d")
-        new_item["eagerbib_comment"] = f"{method} update on {current_date}"
-
-        self.new_item = new_item
+        self.comment = f"{method} update on {current_date}"
 
-    @property
+    @functools.cached_property
     def output(self) -> dict[str, str]:
-        return self.new_item
+        # Update id/key of the new item to match the current item.
+        return self.new_item | {
+            "ID": self.current_item["ID"],
+            "eagerbib_comment": self.comment,
+        }
 
 
 class KeepItemProcessingCommand(BaseProcessingCommand):
@@ -66,11 +80,12 @@ class KeepItemProcessingCommand(BaseProcessingCommand):
 def transform_reference_dict_to_lines(item: dict[str, str]) -> list[str]:
     """Transform a reference dictionary to a list of lines."""
     item_lines = [f"@{item['ENTRYTYPE']}{{{item['ID']},"]
-    for key, value in item.items():
-        if key == "ENTRYTYPE" or key == "ID":
-            continue
-        item_lines += [f"  {key} = {{{value}}},"]
-    item_lines += ["}"]
+    item_lines.extend(
+        f"  {key} = {{{value}}},"
+        for key, value in item.items()
+        if key not in _SKIP_KEYS
+    )
+    item_lines.append("}")
     return item_lines
 
 
@@ -82,16 +97,13 @@ def _normalize_preprints(entries: list[dict[str, str]]):
             in-place.
     """
     print("Normalizing preprints.")
-    for i in range(len(entries)):
-        entry = entries[i]
-        filtered_entry = {k: entry[k] for k in entry if k not in ["abstract"]}
-        entry_str = " ".join(transform_reference_dict_to_lines(filtered_entry)).lower()
+    for i, entry in enumerate(entries):
+        # Find arXiv IDs in the fields of the entry that can reference them.
+        entry_str = " ".join(
+            entry[field] for field in _ARXIV_FIELDS if field in entry
+        )
         arxiv_ids = set()
-        # Find arXiv IDs in the entry. This pattern was proposed by the rebiber authors.
-        for m in re.finditer(
-            r"(arxiv:|arxiv.org\/abs\/|arxiv.org\/pdf\/)([0-9]{4}).([0-9]{5})",
-            entry_str,
-        ):
+        for m in _ARXIV_PATTERN.finditer(entry_str):
             arxiv_ids.add(f"{m.group(2)}.{m.group(3)}")
         if "eprint" in entry and entry.get("archiveprefix", "").lower() == "arxiv":
             arxiv_ids.add(entry["eprint"])
@@ -110,9 +122,8 @@ def _normalize_preprints(entries: list[dict[str, str]]):
             new_entry["volume"] = f"abs/{new_entry['eprint']}"
             new_entry["year"] = "20" + new_entry["eprint"].split(".")[0][:2]
             new_entry["url"] = f"https://arxiv.org/abs/{new_entry['eprint']}"
-            # Update entry by removing old and inserting new entry.
-            entries.pop(i)
-            entries.insert(i, new_entry)
+            # Update entry by replacing it with the new entry.
+            entries[i] = new_entry
 
 
 def _remove_duplicates(entries: list[dict[str, str]]):
@@ -124,33 +135,35 @@ def _remove_duplicates(entries: list[dict[str, str]]):
     """
     # Remove duplicate entries based on their ID.
     duplicated_idxs = []
-    for i1 in range(len(entries)):
-        for i2 in range(i1 + 1, len(entries)):
-            if entries[i1]["ID"] == entries[i2]["ID"]:
-                duplicated_idxs.append(i2)
+    seen_ids = set()
+    for i, entry in enumerate(entries):
+        if entry["ID"] in seen_ids:
+            duplicated_idxs.append(i)
+        else:
+            seen_ids.add(entry["ID"])
     if len(duplicated_idxs) > 0:
         print("Detected duplicate keys:")
         for i in sorted(duplicated_idxs, reverse=True):
             print(f"• {entries[i]['ID']}")
             del entries[i]
 
-    # Remove duplicate entries based on their properties.
-    duplicated_idx_pairs = []
-    for i1 in range(len(entries)):
-        l1 = transform_reference_dict_to_lines(entries[i1])
-        s1 = "\n".join(l1[1:])
-        for i2 in range(i1 + 1, len(entries)):
-            l2 = transform_reference_dict_to_lines(entries[i2])
-            s2 = "\n".join(l2[1:])
-            if s1 == s2:
-                duplicated_idx_pairs.append((i1, i2))
-    duplicated_idxs = sorted(duplicated_idx_pairs, key=lambda x: x[1], reverse=True)
+    # Remove duplicate entries based on their properties, i.e., everything but their
+    # type and ID. Each entry is serialized only once and compared by its hash.
+    # Maps the index of each duplicate to the index of the entry it duplicates.
+    duplicated_idxs: dict[int, int] = {}
+    first_idxs: dict[str, int] = {}
+    for i, entry in enumerate(entries):
+        properties = "\n".join(transform_reference_dict_to_lines(entry)[1:])
+        first_idx = first_idxs.setdefault(properties, i)
+        if first_idx != i:
+            duplicated_idxs[i] = first_idx
     if len(duplicated_idxs) > 0:
         print("Detected duplicate entries:")
-        duplicated_keys = [(entries[i1]['ID'], entries[i2]['ID'])
-                           for i1, i2 in duplicated_idxs]
-        for (i1, i2), (id1, id2) in zip(duplicated_idxs, duplicated_keys):
-            print(f"• {id2} -> {id1}")
+        # The duplicates were found in ascending order. Deleting them from the back
+        # keeps the indices of the remaining entries valid, as every duplicate comes
+        # after the entry it duplicates.
+        for i2 in reversed(duplicated_idxs):
+            print(f"• {entries[i2]['ID']} -> {entries[duplicated_idxs[i2]]['ID']}")
             del entries[i2]
 
 
@@ -188,19 +201,20 @@ def _apply_abbreviations(
     print("Normalizing names.")
 
     for abbreviation in abbreviations:
+        # Compile the regular expressions once and check if they are valid.
+        patterns = []
         for full_name in abbreviation.alternative_names:
-            # Check if the regular expression is valid.
             try:
-                re.compile(full_name)
+                patterns.append(re.compile(full_name))
             except re.error:
                 print(
                     f"• Invalid regular expression for {abbreviation.name}: {full_name}"
                 )
                 sys.exit(-1)
-            for entry in entries:
-                for field in ["journal", "booktitle"]:
-                    if field in entry and re.match(full_name, entry[field]):
-                        entry[field] = abbreviation.name
+        for entry in entries:
+            for field in ["journal", "booktitle"]:
+                if field in entry and any(p.match(entry[field]) for p in patterns):
+                    entry[field] = abbreviation.name
 
 
 def process_commands(
@@ -215,11 +229,11 @@ def process_commands(
     Returns:
         list[dict[str, str]]: The output bibliography items.
     """
-    entries = [command.output for command in commands]
+    entries = list(map(operator.attrgetter("output"), commands))
 
     # Sort entries.
     if config.sort:
-        entries = sorted(entries, key=lambda x: x["ID"])
+        entries.sort(key=operator.itemgetter("ID"))
 
     # Apply name_normalizations.
     if len(config.name_normalizations) > 0:
@@ -247,13 +261,10 @@ def write_output(output: list[dict[str, str]], output_fn: str) -> None:
         output (list[dict[str, str]]): The output bibliography items to write.
         output_fn (str): The path to the output file.
     """
-    all_lines = []
-    for item in output:
-        all_lines += transform_reference_dict_to_lines(item) + [""]
-
-    # Remove the last newline.
-    if len(all_lines) > 0:
-        del all_lines[-1]
-
-    with open(output_fn, "w") as f:
-        f.write("\n".join(all_lines))
+    # Write the items one by one, separated by an empty line, instead of building
+    # the whole file in memory first.
+    with open(output_fn, "w", buffering=1 << 20) as f:
+        for i, item in enumerate(output):
+            if i > 0:
+                f.write("\n\n")
+            f.write("\n".join(transform_reference_dict_to_lines(item)))
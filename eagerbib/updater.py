@@ -1,14 +1,16 @@
 """Update the offline bibliography files from pre-crawled data online."""
 import argparse
-import glob
+import concurrent.futures
 import math
 import os
+import shutil
 import tarfile
 import tempfile
 from typing import Optional
 
 import requests
 import tqdm
+import tqdm.utils
 
 import eagerbib.utils as ut
 
@@ -16,41 +18,130 @@ __predefined_bibliographies = {
     "mlcv": "https://github.com/zimmerrol/eagerbib-data/raw/data/data/mlcv.tar.gz",
 }
 
+# Packages larger than this are downloaded in several parts in parallel if the
+# server supports range requests.
+__RANGE_DOWNLOAD_THRESHOLD = 16 * 1024 * 1024
+__N_RANGE_DOWNLOADS = 4
 
-def download_bibliography_package(bibliography_url: str) -> str:
-    """Download the bibliography package from the given URL to a temporary file.
+
+def __get_range_download_info(bibliography_url: str) -> Optional[tuple[str, int]]:
+    """Check whether the bibliography package can be downloaded in parallel parts.
 
     Args:
         bibliography_url (str): The URL to the bibliography package.
 
     Returns:
-        str: The path to the temporary file.
+        Optional[tuple[str, int]]: The URL after following redirects and the size
+            of the package in bytes, or None if the server does not support range
+            requests or the package is too small to benefit from them.
     """
-    # Download the .tar.gz file to a temporary file
-    response = requests.get(bibliography_url, stream=True)
+    try:
+        response = requests.head(bibliography_url, allow_redirects=True)
+    except requests.RequestException:
+        return None
     if response.status_code != 200:
+        return None
+    if response.headers.get("accept-ranges", "").lower() != "bytes":
+        return None
+    if "content-encoding" in response.headers:
+        return None
+    length = int(response.headers.get("content-length", 0))
+    if length <= __RANGE_DOWNLOAD_THRESHOLD:
+        return None
+    return response.url, length
+
+
+def __download_range(
+    bibliography_url: str, fn: str, start: int, end: int, progress: tqdm.tqdm
+) -> None:
+    """Download the bytes start to end (inclusive) of a file to the same position of
+    a local file.
+
+    Args:
+        bibliography_url (str): The URL to download from.
+        fn (str): The local file, which must already have the full size.
+        start (int): The first byte to download.
+        end (int): The last byte to download.
+        progress (tqdm.tqdm): The progress bar to update.
+    """
+    response = requests.get(
+        bibliography_url, headers={"Range": f"bytes={start}-{end}"}, stream=True
+    )
+    if response.status_code != 206:
         raise ValueError(
             f"Could not download {bibliography_url}. "
             f"Status code: {response.status_code}"
         )
-    length: Optional[int] = int(
-        response.headers.get(
-            "content-length", response.headers.get("Content-length", 0)
+    with response, open(fn, "r+b") as f:
+        f.seek(start)
+        # Copy the raw stream straight to disk instead of creating an intermediate
+        # chunk for each read.
+        shutil.copyfileobj(
+            tqdm.utils.CallbackIOWrapper(progress.update, response.raw, "read"),
+            f,
+            length=64 * 1024,
         )
-    )
-    if length is not None:
-        length = int(math.ceil(length / (1024 * 1024)))
-    else:
-        length = None
-    tmp_fn = os.path.join(tempfile.mkdtemp(), bibliography_url.split("/")[-1])
+
+
+def __download_bibliography_package_in_ranges(
+    bibliography_url: str, length: int, tmp_fn: str
+) -> None:
+    """Download the bibliography package in several parts in parallel.
+
+    Args:
+        bibliography_url (str): The URL to the bibliography package.
+        length (int): The size of the package in bytes.
+        tmp_fn (str): The file to download the package to.
+    """
     with open(tmp_fn, "wb") as f:
-        for data in tqdm.tqdm(
-            response.iter_content(chunk_size=1024 * 1024), unit="mb", total=length,
-            desc="Downloading bibliography package."
-        ):
-            f.write(data)
+        f.truncate(length)
+    part_size = int(math.ceil(length / __N_RANGE_DOWNLOADS))
+    with tqdm.tqdm(
+        unit="B",
+        unit_scale=True,
+        unit_divisor=1024,
+        total=length,
+        desc="Downloading bibliography package.",
+    ) as progress, concurrent.futures.ThreadPoolExecutor(
+        __N_RANGE_DOWNLOADS
+    ) as executor:
+        futures = [
+            executor.submit(
+                __download_range,
+                bibliography_url,
+                tmp_fn,
+                start,
+                min(start + part_size, length) - 1,
+                progress,
+            )
+            for start in range(0, length, part_size)
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+
+
+def __open_bibliography_package_stream(
+    bibliography_url: str,
+) -> tuple[requests.Response, Optional[int]]:
+    """Request the bibliography package for reading it from the raw stream.
+
+    Args:
+        bibliography_url (str): The URL to the bibliography package.
 
-    return tmp_fn
+    Returns:
+        tuple[requests.Response, Optional[int]]: The response and the size of the
+            package in bytes if known.
+    """
+    response = requests.get(bibliography_url, stream=True)
+    if response.status_code != 200:
+        raise ValueError(
+            f"Could not download {bibliography_url}. "
+            f"Status code: {response.status_code}"
+        )
+    length = int(response.headers.get("content-length", 0)) or None
+    # Decode the raw stream only if the server applied a content encoding.
+    response.raw.decode_content = True
+    return response, length
 
 
 def extract_bibliography_package(
@@ -78,16 +169,52 @@ def extract_bibliography_package(
         os.remove(bibliography_package_fn)
 
 
+def download_and_extract_bibliography_package(
+    bibliography_url: str, data_directory: str
+) -> None:
+    """Extract the bibliography package (tar.gz) to the given directory while it is
+    downloaded, without storing the package itself on disk.
+
+    Args:
+        bibliography_url (str): The URL to the bibliography package.
+        data_directory (str): The directory to extract the bibliography package to.
+    """
+    response, length = __open_bibliography_package_stream(bibliography_url)
+    with response, tqdm.tqdm(
+        unit="B",
+        unit_scale=True,
+        unit_divisor=1024,
+        total=length,
+        desc="Downloading bibliography package.",
+    ) as progress:
+        stream = tqdm.utils.CallbackIOWrapper(progress.update, response.raw, "read")
+        try:
+            # The streaming mode reads the archive sequentially without seeking.
+            with tarfile.open(fileobj=stream, mode="r|gz") as file:
+                file.extractall(data_directory)
+        except tarfile.ReadError:
+            raise ValueError(f"Could not read {bibliography_url} as a tar.gz file.")
+        except tarfile.ExtractError:
+            raise ValueError(
+                f"Could not extract {bibliography_url} to {data_directory}."
+            )
+
+
 def clear_existing_bibliography_files(data_directory: str):
     """Clear the existing bibliography files.
 
     Args:
         data_directory (str): The directory to clear the bibliography files from.
     """
-    for fn in glob.glob(f"{data_directory}/*.bib"):
-        os.remove(fn)
-    if os.path.exists(f"{data_directory}/cache.json.gz"):
-        os.remove(f"{data_directory}/cache.json.gz")
+    if not os.path.isdir(data_directory):
+        return
+    with os.scandir(data_directory) as it:
+        for entry in it:
+            if entry.name.endswith(".bib") and entry.is_file():
+                os.remove(entry.path)
+    for cache_fn in (ut.BIBLIOGRAPHY_CACHE_FN, ut.LEGACY_BIBLIOGRAPHY_CACHE_FN):
+        if os.path.exists(f"{data_directory}/{cache_fn}"):
+            os.remove(f"{data_directory}/{cache_fn}")
 
 
 def update_bibliography_files(
@@ -105,10 +232,44 @@ def update_bibliography_files(
     else:
         bibliography_url = bibliography_name_or_url
 
-    bibliography_fn = download_bibliography_package(bibliography_url)
-    if replace_existing:
-        clear_existing_bibliography_files(data_directory)
-    extract_bibliography_package(bibliography_fn, data_directory)
+    # Extract the package next to the existing files first, so that these are only
+    # replaced once the package has been downloaded completely.
+    os.makedirs(data_directory, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=data_directory) as staging_directory:
+        range_download_info = __get_range_download_info(bibliography_url)
+        if range_download_info is None:
+            download_and_extract_bibliography_package(
+                bibliography_url, staging_directory
+            )
+        else:
+            # Downloading in parallel parts requires writing the package to disk.
+            with tempfile.TemporaryDirectory() as download_directory:
+                bibliography_fn = os.path.join(
+                    download_directory, bibliography_url.split("/")[-1]
+                )
+                __download_bibliography_package_in_ranges(
+                    *range_download_info, bibliography_fn
+                )
+                extract_bibliography_package(bibliography_fn, staging_directory)
+
+        if replace_existing:
+            clear_existing_bibliography_files(data_directory)
+        elif any(
+            os.path.exists(os.path.join(staging_directory, cache_fn))
+            for cache_fn in (ut.BIBLIOGRAPHY_CACHE_FN, ut.LEGACY_BIBLIOGRAPHY_CACHE_FN)
+        ):
+            # The cache of the package supersedes the existing one. Remove the latter
+            # also if it is stored in the other format, as it might be read instead.
+            for cache_fn in (ut.BIBLIOGRAPHY_CACHE_FN, ut.LEGACY_BIBLIOGRAPHY_CACHE_FN):
+                if os.path.exists(os.path.join(data_directory, cache_fn)):
+                    os.remove(os.path.join(data_directory, cache_fn))
+        # Move the extracted files into place, merging directories that exist already.
+        shutil.copytree(
+            staging_directory,
+            data_directory,
+            copy_function=os.replace,
+            dirs_exist_ok=True,
+        )
 
 
 def main() -> None:
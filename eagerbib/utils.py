@@ -1,29 +1,180 @@
-import itertools
+import functools
+import mmap
 import os
 import re
 import hashlib
-from typing import Iterable, Any
+import warnings
+from typing import Any, Union
 import platformdirs
 
+# Optional dependency for a considerably faster hashing of files.
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+# Optional dependency for a faster, JIT-compiled normalization of non-ASCII titles.
+try:
+    import pcre2
+except ImportError:
+    pcre2 = None
 
-def chunk_iterable(
-        iterable: Iterable[Any], n: int, fillvalue: Any = None
-) -> Iterable[list[Any]]:
-    """Chunks an iterable into chunks of size n.
+
+# The file names of the bibliography cache in the preferred (zstd-compressed) and
+# legacy (gzip-compressed) format.
+BIBLIOGRAPHY_CACHE_FN = "cache.json.zst"
+LEGACY_BIBLIOGRAPHY_CACHE_FN = "cache.json.gz"
+
+
+# Patterns used to parse well-formed BibTeX files and responses.
+_ENTRY_START_PATTERN = re.compile(r"@\s*([a-zA-Z]+)\s*\{\s*")
+_ENTRY_KEY_PATTERN = re.compile(r"([^,\s{}]+)\s*,")
+_FIELD_NAME_PATTERN = re.compile(r"\s*([^\s=,{}\"#]+)\s*=\s*")
+_BARE_VALUE_PATTERN = re.compile(r"[^\s#,{}\"]+")
+_BRACE_PATTERN = re.compile(r"[{}]")
+_QUOTED_VALUE_PATTERN = re.compile(r'[{}"]')
+_WHITESPACE_PATTERN = re.compile(r"\s*")
+_MONTHS = {
+    "jan": "January",
+    "feb": "February",
+    "mar": "March",
+    "apr": "April",
+    "may": "May",
+    "jun": "June",
+    "jul": "July",
+    "aug": "August",
+    "sep": "September",
+    "oct": "October",
+    "nov": "November",
+    "dec": "December",
+}
+
+
+def _read_bibtex_value(text: str, pos: int) -> tuple[str, int]:
+    """Read a (potentially concatenated) BibTeX field value.
+
+    Args:
+        text (str): The BibTeX string.
+        pos (int): The position where the value starts.
+
+    Returns:
+        tuple[str, int]: The value and the position after it.
+
+    Raises:
+        ValueError: If the value is malformed.
+    """
+    parts = []
+    while True:
+        pos = _WHITESPACE_PATTERN.match(text, pos).end()
+        if text.startswith("{", pos):
+            depth = 0
+            for m in _BRACE_PATTERN.finditer(text, pos):
+                depth += 1 if m.group() == "{" else -1
+                if depth == 0:
+                    parts.append(text[pos + 1 : m.start()])
+                    pos = m.end()
+                    break
+            else:
+                raise ValueError("Unbalanced braces.")
+        elif text.startswith('"', pos):
+            depth = 0
+            for m in _QUOTED_VALUE_PATTERN.finditer(text, pos + 1):
+                if m.group() == '"' and depth == 0:
+                    parts.append(text[pos + 1 : m.start()])
+                    pos = m.end()
+                    break
+                elif m.group() != '"':
+                    depth += 1 if m.group() == "{" else -1
+            else:
+                raise ValueError("Unterminated quoted value.")
+        else:
+            m = _BARE_VALUE_PATTERN.match(text, pos)
+            if m is None:
+                raise ValueError("Missing value.")
+            parts.append(_MONTHS.get(m.group().lower(), m.group()))
+            pos = m.end()
+
+        pos = _WHITESPACE_PATTERN.match(text, pos).end()
+        if text.startswith("#", pos):
+            pos += 1
+        else:
+            break
+
+    value = "".join(parts)
+    # Remove the indentation of values spanning multiple lines.
+    value = "\n".join(line.strip() for line in value.splitlines())
+    return value, pos
+
+
+def parse_bibtex_entries(text: str) -> list[dict[str, str]]:
+    """Parse the entries of a BibTeX string.
+
+    This is a minimal but much faster alternative to bibtexparser for well-formed
+    BibTeX, e.g., the files and responses of dblp or Crossref. Field names are
+    lowercased and month abbreviations are expanded, as done by bibtexparser.
+    Malformed entries are skipped.
 
     Args:
-        iterable (Iterable[Any]): The iterable to chunk.
-        n (int): The size of the chunks.
-        fillvalue (Any, optional): The value to use to fill the last chunk if the
-            iterable is not divisible by n. Defaults to None.
+        text (str): The BibTeX string.
 
     Returns:
-        Iterable[list[Any]]: The chunks.
+        list[dict[str, str]]: The parsed entries.
     """
-    args = [iter(iterable)] * n
-    return itertools.zip_longest(*args, fillvalue=fillvalue)
+    entries = []
+    pos = 0
+    while True:
+        m = _ENTRY_START_PATTERN.search(text, pos)
+        if m is None:
+            break
+        pos = m.end()
+        entry_type = m.group(1).lower()
+        if entry_type in ("comment", "preamble", "string"):
+            continue
+        key_match = _ENTRY_KEY_PATTERN.match(text, pos)
+        if key_match is None:
+            continue
+        pos = key_match.end()
+
+        entry = {}
+        try:
+            while True:
+                pos = _WHITESPACE_PATTERN.match(text, pos).end()
+                if text.startswith("}", pos):
+                    break
+                field_match = _FIELD_NAME_PATTERN.match(text, pos)
+                if field_match is None:
+                    raise ValueError("Missing field name.")
+                value, pos = _read_bibtex_value(text, field_match.end())
+                entry[field_match.group(1).lower()] = value
+                if text.startswith(",", pos):
+                    pos += 1
+        except ValueError:
+            continue
+
+        entry["ENTRYTYPE"] = entry_type
+        entry["ID"] = key_match.group(1)
+        entries.append(entry)
+    return entries
+
+
+# Pattern used to normalize titles, which matches runs of characters that are not
+# letters or digits.
+if pcre2 is not None:
+    _NON_ALPHANUMERIC_PATTERN = pcre2.compile(r"[^a-zA-Z0-9]+")
+    try:
+        _NON_ALPHANUMERIC_PATTERN.jit_compile()
+    except pcre2.LibraryError:
+        # The pattern is interpreted if PCRE2 was built without JIT support.
+        pass
+else:
+    _NON_ALPHANUMERIC_PATTERN = re.compile(r"[^a-zA-Z0-9]+")
+# Translation table that replaces all bytes except for letters and digits with
+# spaces, which is faster than the pattern for ASCII strings.
+_NON_ALPHANUMERIC_TABLE = bytes(
+    c if chr(c).isascii() and chr(c).isalnum() else ord(" ") for c in range(256)
+)
 
 
+@functools.lru_cache(maxsize=65536)
 def cleanup_title(title: str) -> str:
     """Cleans up a title string by removing extra spaces, non-alphanumeric characters.
 
@@ -33,15 +184,18 @@ def cleanup_title(title: str) -> str:
     Returns:
         str: The cleaned up title.
     """
-    title = re.sub(r"[^a-zA-Z0-9]", r" ", title)
-    title = re.sub(r"\s\s", r" ", title)
-    title = re.sub(r"  ", r" ", title)
-    title = title.strip()
-    return title
+    if title.isascii():
+        title = title.encode().translate(_NON_ALPHANUMERIC_TABLE).decode()
+        # Splitting on whitespace also removes leading, trailing and repeated
+        # spaces.
+        return " ".join(title.split())
+    # Replacing whole runs leaves only single spaces besides the outer ones.
+    return _NON_ALPHANUMERIC_PATTERN.sub(" ", title).strip()
 
 
+@functools.lru_cache(maxsize=65536)
 def cleanup_author(author: str) -> str:
-    """Cleans up an author string by removing newlines and double spaces.
+    """Cleans up an author string by collapsing whitespace, including newlines.
 
     Args:
         author (str): The author to clean up.
@@ -49,29 +203,72 @@ def cleanup_author(author: str) -> str:
     Returns:
         str: The cleaned up author.
     """
-    author = author.replace("\n", " ")
-    author = re.sub(r"\s\s", r" ", author)
-    author = re.sub(r"  ", r" ", author)
-    author = author.strip()
-    return author
+    return " ".join(author.split())
+
+
+# Size of the chunks in which files are read for hashing them.
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Files of at least this size are memory-mapped instead of being read in chunks
+# for hashing them, which avoids copying their contents.
+_HASH_MMAP_THRESHOLD = 10 * 1024 * 1024
 
 
 def get_md5_hash(fn: str) -> str:
     """Compute the MD5 hash of a file.
 
+    Deprecated, as eagerbib identifies files by the faster hash computed by
+    get_fast_hash_bytes instead.
+
     Args:
         fn (str): The path to the file.
 
     Returns:
         str: The MD5 hash of the file.
     """
+    warnings.warn(
+        "get_md5_hash is deprecated, use get_fast_hash_bytes instead.",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     hash_md5 = hashlib.md5()
     with open(fn, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
+        if os.fstat(f.fileno()).st_size >= _HASH_MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hash_md5.update(mm)
+            return hash_md5.hexdigest()
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "md5").hexdigest()
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
             hash_md5.update(chunk)
     return hash_md5.hexdigest()
 
 
+def _new_fast_hash() -> Any:
+    """Create a hash object for get_fast_hash_bytes, preferring xxHash if available."""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def get_fast_hash_bytes(data: Union[bytes, bytearray, memoryview]) -> str:
+    """Compute a fast (non-cryptographic use) hash of data that has already been
+    read, e.g., the contents of a file.
+
+    This is the 128 bit XXH3 hash if xxhash is installed and the 128 bit BLAKE2b
+    hash otherwise, so hashes should only be compared within one installation.
+
+    Args:
+        data (Union[bytes, bytearray, memoryview]): The data.
+
+    Returns:
+        str: The 128 bit hash of the data.
+    """
+    fast_hash = _new_fast_hash()
+    fast_hash.update(data)
+    return fast_hash.hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
 def get_default_data_directory() -> str:
     """Returns the default data directory.
 
@@ -79,6 +276,17 @@ def get_default_data_directory() -> str:
         str: The default data directory.
     """
     path = os.path.join(platformdirs.user_data_dir("eagerbib"), "data")
-    if not os.path.exists(path):
-        os.makedirs(path)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@functools.lru_cache(maxsize=1)
+def get_default_cache_directory() -> str:
+    """Returns the default cache directory.
+
+    Returns:
+        str: The default cache directory.
+    """
+    path = platformdirs.user_cache_dir("eagerbib")
+    os.makedirs(path, exist_ok=True)
     return path